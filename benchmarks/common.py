@@ -0,0 +1,90 @@
+"""Общие части бенчмарков: настройка Django, статистика и отчёты."""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'blogicum'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+
+
+def setup_django(database_path, database=None, migrate=True, **overrides):
+    """Настраивает Django на временную базу и применяет миграции.
+
+    `database` дополняет настройки базы (ENGINE, OPTIONS), остальные
+    именованные аргументы заменяют одноимённые настройки.
+    """
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = database_path
+    settings.DATABASES['default'].update(database or {})
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    django.setup()
+
+    if migrate:
+        from django.core.management import call_command
+
+        call_command('migrate', verbosity=0)
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def summarize(timings):
+    """Перцентили и среднее для списка замеров в миллисекундах."""
+    return {
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'max_ms': round(max(timings), 3),
+    }
+
+
+def revision():
+    """Текущий коммит и признак незакоммиченных изменений."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('-dirty' if dirty else '')
+
+
+def environment():
+    import django
+
+    return {
+        'revision': revision(),
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'platform': platform.platform(),
+    }
+
+
+def write_report(path, report):
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if path == '-':
+        print(text)
+        return
+    Path(path).write_text(text + '\n', encoding='utf-8')
+
+
+def read_report(path):
+    return json.loads(Path(path).read_text(encoding='utf-8'))
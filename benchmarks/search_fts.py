@@ -0,0 +1,148 @@
+"""Бенчмарк полнотекстового поиска по публикациям.
+
+Создаёт временную базу SQLite, заполняет её синтетическими постами
+со словарём, распределённым по закону Ципфа, и замеряет время запроса
+первой страницы поиска — того же, что выполняет PostSearchView.
+
+    python benchmarks/search_fts.py --posts 1000000 --queries 200
+"""
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+from common import percentile, setup_django
+
+BATCH_SIZE = 10_000
+VOCABULARY_SIZE = 20_000
+WORDS_IN_TITLE = 6
+WORDS_IN_TEXT = 60
+
+
+def make_vocabulary(rng):
+    alphabet = 'абвгдеёжзийклмнопрстуфхцчшщыэюя'
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        length = rng.randint(3, 10)
+        words.add(''.join(rng.choice(alphabet) for _ in range(length)))
+    return sorted(words)
+
+
+def fill_posts(count, vocabulary, rng):
+    from django.db import connection, transaction
+    from django.utils import timezone
+
+    # Веса по Ципфу: немногие слова встречаются часто, большинство — редко.
+    cum_weights = list(itertools.accumulate(
+        1 / rank for rank in range(1, len(vocabulary) + 1)
+    ))
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO auth_user (password, is_superuser, username, "
+            "first_name, last_name, email, is_staff, is_active, date_joined) "
+            "VALUES ('', 0, 'bench', '', '', '', 0, 1, %s)", [now]
+        )
+        author_id = cursor.lastrowid
+        cursor.execute(
+            "INSERT INTO blog_category (is_published, created_at, title, "
+            "description, slug) VALUES (1, %s, 'Бенчмарк', '', 'bench')",
+            [now]
+        )
+        category_id = cursor.lastrowid
+
+    sql = (
+        "INSERT INTO blog_post (is_published, created_at, updated_at, title, "
+        "text, pub_date, author_id, category_id, image, comment_count, "
+        "has_image_variants) "
+        "VALUES (1, %s, %s, %s, %s, %s, %s, %s, '', 0, 0)"
+    )
+    started = time.perf_counter()
+    for offset in range(0, count, BATCH_SIZE):
+        rows = []
+        for number in range(offset, min(offset + BATCH_SIZE, count)):
+            words = rng.choices(
+                vocabulary, cum_weights=cum_weights,
+                k=WORDS_IN_TITLE + WORDS_IN_TEXT
+            )
+            pub_date = now - timedelta(minutes=number)
+            rows.append((
+                now, now,
+                ' '.join(words[:WORDS_IN_TITLE]),
+                ' '.join(words[WORDS_IN_TITLE:]),
+                pub_date, author_id, category_id,
+            ))
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, rows)
+        print(f'\rПостов: {min(offset + BATCH_SIZE, count)}', end='')
+    print(f' за {time.perf_counter() - started:.1f} с')
+
+
+def run_queries(vocabulary, count, rng):
+    from django.core.paginator import Paginator
+
+    from blog.models import Post
+    from blog.search import search_posts
+
+    # Запросы из частых, средних и редких слов, по одному и парами.
+    frequent = vocabulary[:50]
+    medium = vocabulary[500:2000]
+    rare = vocabulary[5000:]
+    queries = []
+    for _ in range(count):
+        kind = rng.choice((frequent, medium, rare))
+        terms = rng.sample(kind, rng.choice((1, 2)))
+        queries.append(' '.join(terms))
+
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        results = search_posts(Post.objects.published().with_related(), query)
+        # Как в PostSearchView: Paginator считает результаты целиком.
+        list(Paginator(results, 10).get_page(1))
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--target-ms', type=float, default=10.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument(
+        '--candidates', type=int,
+        help='Переопределить BLOG_SEARCH_MAX_CANDIDATES.'
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        overrides = {}
+        if args.candidates:
+            overrides['BLOG_SEARCH_MAX_CANDIDATES'] = args.candidates
+        setup_django(os.path.join(directory, 'search.sqlite3'), **overrides)
+        vocabulary = make_vocabulary(rng)
+        fill_posts(args.posts, vocabulary, rng)
+        timings = run_queries(vocabulary, args.queries, rng)
+
+    p50 = statistics.median(timings)
+    p95 = percentile(timings, 0.95)
+    p99 = percentile(timings, 0.99)
+    print(
+        f'Запросов: {len(timings)}; p50 {p50:.2f} мс, p95 {p95:.2f} мс, '
+        f'p99 {p99:.2f} мс, максимум {max(timings):.2f} мс'
+    )
+    if p95 > args.target_ms:
+        print(f'p95 превышает цель {args.target_ms} мс')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
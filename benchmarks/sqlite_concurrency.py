@@ -0,0 +1,183 @@
+"""Бенчмарк чтения ленты при параллельной записи комментариев.
+
+Для каждой конфигурации SQLite создаёт временную базу, заполняет её
+командой generate_blog_data и запускает процессы-читатели (первая
+страница ленты, как в PostListView) и процессы-писатели (комментарий
+в транзакции: чтение публикации, затем вставка, как в
+CommentCreateView). Считает операции в секунду, задержки чтения
+и ошибки «database is locked».
+
+    python benchmarks/sqlite_concurrency.py --readers 4 --writers 4
+
+Конфигурации:
+
+- default — встроенный бэкенд Django: журнал отката, BEGIN DEFERRED;
+- tuned — core.db.backends.sqlite3: WAL, synchronous=NORMAL, mmap,
+  busy_timeout и BEGIN IMMEDIATE.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from io import StringIO
+
+from common import environment, setup_django, summarize, write_report
+
+CONFIGS = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'OPTIONS': {},
+    },
+    'tuned': {
+        'ENGINE': 'core.db.backends.sqlite3',
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+    },
+}
+
+
+def prepare(database_path, config, posts, seed):
+    setup_django(database_path, CONFIGS[config])
+    from django.core.management import call_command
+
+    call_command(
+        'generate_blog_data', users=100, posts=posts, comments=posts * 3,
+        seed=seed, stdout=StringIO()
+    )
+
+
+def read_feed():
+    from blog.models import Post
+
+    list(Post.objects.published().with_related()[:10])
+
+
+def write_comment(rng, post_ids, user_ids):
+    from django.db import transaction
+
+    from blog.models import Comment, Post
+
+    with transaction.atomic():
+        post = Post.objects.get(pk=rng.choice(post_ids))
+        Comment.objects.create(
+            post=post, author_id=rng.choice(user_ids), text='Комментарий'
+        )
+
+
+def worker(role, database_path, config, seconds, start, results):
+    setup_django(database_path, CONFIGS[config], migrate=False)
+    from django.contrib.auth import get_user_model
+    from django.db import OperationalError
+
+    from blog.models import Post
+
+    rng = random.Random(os.getpid())
+    post_ids = list(Post.objects.published().values_list('pk', flat=True))
+    user_ids = list(get_user_model().objects.values_list('pk', flat=True))
+    operations = errors = 0
+    timings = []
+    start.wait()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            if role == 'reader':
+                read_feed()
+            else:
+                write_comment(rng, post_ids, user_ids)
+        except OperationalError:
+            errors += 1
+            continue
+        timings.append((time.perf_counter() - started) * 1000)
+        operations += 1
+    results.put((role, operations, errors, timings))
+
+
+def run_config(config, args):
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = os.path.join(directory, f'{config}.sqlite3')
+        process = context.Process(
+            target=prepare,
+            args=(database_path, config, args.posts, args.seed)
+        )
+        process.start()
+        process.join()
+        if process.exitcode:
+            raise SystemExit(f'{config}: не удалось подготовить базу')
+
+        start = context.Event()
+        results = context.Queue()
+        roles = ['reader'] * args.readers + ['writer'] * args.writers
+        processes = [
+            context.Process(target=worker, args=(
+                role, database_path, config, args.seconds, start, results
+            ))
+            for role in roles
+        ]
+        for process in processes:
+            process.start()
+        # Даём процессам загрузить Django, прежде чем запускать отсчёт.
+        time.sleep(args.startup)
+        start.set()
+        collected = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+    report = {}
+    for role in ('reader', 'writer'):
+        rows = [row for row in collected if row[0] == role]
+        timings = [timing for row in rows for timing in row[3]]
+        operations = sum(row[1] for row in rows)
+        report[role] = {
+            'processes': len(rows),
+            'operations': operations,
+            'per_second': round(operations / args.seconds, 1),
+            'locked_errors': sum(row[2] for row in rows),
+            **(summarize(timings) if timings else {}),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument(
+        '--startup', type=float, default=3.0,
+        help='Сколько секунд ждать запуска процессов.'
+    )
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument(
+        '--config', nargs='+', choices=CONFIGS, default=list(CONFIGS)
+    )
+    parser.add_argument('--output', help='Записать результаты в JSON.')
+    args = parser.parse_args()
+
+    results = {}
+    for config in args.config:
+        results[config] = run_config(config, args)
+        reader, writer = results[config]['reader'], results[config]['writer']
+        print(
+            f'{config:<8} чтений/с {reader["per_second"]:8.1f} '
+            f'(p95 {reader.get("p95_ms", 0):7.2f} мс, ошибок '
+            f'{reader["locked_errors"]}), записей/с '
+            f'{writer["per_second"]:7.1f} '
+            f'(p95 {writer.get("p95_ms", 0):7.2f} мс, ошибок '
+            f'{writer["locked_errors"]})'
+        )
+    if args.output:
+        write_report(args.output, {
+            'environment': environment(),
+            'parameters': vars(args),
+            'configs': results,
+        })
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,345 @@
+"""Бенчмарк страниц и действий блога через тестовый Client.
+
+Создаёт временную базу SQLite, заполняет её командой generate_blog_data
+и для каждого сценария замеряет задержку (p50/p95/p99), число
+SQL-запросов и пик выделенной памяти на запрос. Результат — JSON,
+который можно сравнить с результатом другого коммита:
+
+    python benchmarks/views.py --output before.json
+    python benchmarks/views.py --output after.json --compare before.json
+    python benchmarks/views.py --compare before.json after.json
+
+Страницы читаются анонимно с пустым кешем (перед каждым запросом
+кеш очищается вне замера), если не указан --warm-cache.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import StringIO
+
+from common import (
+    environment, read_report, setup_django, summarize, write_report
+)
+
+# Доля роста p95, после которой сценарий считается замедлившимся.
+DEFAULT_THRESHOLD = 0.1
+
+
+class Scenario:
+    """Запрос, который замеряется, и подготовка к нему вне замера."""
+
+    def __init__(self, name, prepare, cached=False):
+        self.name = name
+        self.prepare = prepare
+        self.cached = cached
+
+
+class Dataset:
+    """Данные, на которых выполняются сценарии."""
+
+    def __init__(self, users, posts, comments, detail_comments, seed):
+        from django.contrib.auth import get_user_model
+        from django.core.management import call_command
+        from django.db.models import Count, Q
+        from django.test import Client
+        from django.utils import timezone
+
+        from blog.models import Category, Comment, Post
+
+        call_command(
+            'generate_blog_data', users=users, posts=posts,
+            comments=comments, seed=seed, stdout=StringIO()
+        )
+        user_model = get_user_model()
+        # Самый «тяжёлый» автор и самая популярная видимая категория.
+        self.author = user_model.objects.annotate(
+            total=Count('post')
+        ).order_by('-total').first()
+        self.category = Category.objects.filter(
+            is_published=True
+        ).annotate(
+            total=Count('post', filter=Q(post__is_published=True))
+        ).order_by('-total').first()
+        self.now = timezone.now()
+        self.detail_post = self.create_post()
+        Comment.objects.bulk_create(
+            Comment(post=self.detail_post, author=self.author,
+                    text=f'Комментарий {number}')
+            for number in range(detail_comments)
+        )
+        Post.objects.filter(pk=self.detail_post.pk).update(
+            comment_count=detail_comments
+        )
+        self.target_post = self.create_post()
+        self.anonymous = Client()
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def create_post(self):
+        from blog.models import Post
+
+        return Post.objects.create(
+            title='Публикация для бенчмарка', text='Текст',
+            pub_date=self.now, author=self.author, category=self.category
+        )
+
+    def create_comment(self):
+        from blog.models import Comment
+
+        return Comment.objects.create(
+            post=self.target_post, author=self.author, text='Комментарий'
+        )
+
+    def post_form(self, title):
+        return {
+            'title': title,
+            'text': 'Текст публикации',
+            'pub_date': self.now.strftime('%Y-%m-%dT%H:%M'),
+            'category': self.category.pk,
+        }
+
+
+def make_scenarios(data):
+    """Сценарии: страницы для чтения и действия автора."""
+    from django.urls import reverse
+
+    def get(client, url):
+        return lambda: client.get(url)
+
+    def read(url):
+        return lambda: get(data.anonymous, url)
+
+    def create_post():
+        url = reverse('blog:create_post')
+        return lambda: data.client.post(url, data.post_form('Новая'))
+
+    def edit_post():
+        url = reverse('blog:edit_post', args=[data.target_post.pk])
+        return lambda: data.client.post(url, data.post_form('Изменена'))
+
+    def delete_post():
+        url = reverse('blog:delete_post', args=[data.create_post().pk])
+        return lambda: data.client.post(url)
+
+    def add_comment():
+        url = reverse('blog:add_comment', args=[data.target_post.pk])
+        return lambda: data.client.post(url, {'text': 'Новый комментарий'})
+
+    def comment_url(name):
+        comment = data.create_comment()
+        return reverse(f'blog:{name}', args=[comment.post_id, comment.pk])
+
+    def edit_comment():
+        url = comment_url('edit_comment')
+        return lambda: data.client.post(url, {'text': 'Изменён'})
+
+    def delete_comment():
+        url = comment_url('delete_comment')
+        return lambda: data.client.post(url)
+
+    return [
+        Scenario('index', read(reverse('blog:index')), cached=True),
+        Scenario('category', read(reverse(
+            'blog:category_posts', args=[data.category.slug]
+        )), cached=True),
+        Scenario('profile', read(reverse(
+            'blog:profile', args=[data.author.username]
+        )), cached=True),
+        Scenario('post_detail', read(reverse(
+            'blog:post_detail', args=[data.detail_post.pk]
+        )), cached=True),
+        Scenario('create_post_form', lambda: get(
+            data.client, reverse('blog:create_post')
+        )),
+        Scenario('create_post', create_post),
+        Scenario('edit_post', edit_post),
+        Scenario('delete_post', delete_post),
+        Scenario('add_comment', add_comment),
+        Scenario('edit_comment', edit_comment),
+        Scenario('delete_comment', delete_comment),
+    ]
+
+
+def measure(scenario, iterations, warmup, memory_runs, warm_cache):
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    def prepare():
+        if scenario.cached and not warm_cache:
+            cache.clear()
+        return scenario.prepare()
+
+    for _ in range(warmup):
+        prepare()()
+
+    timings = []
+    queries = []
+    statuses = set()
+    for _ in range(iterations):
+        request = prepare()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = request()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured))
+        statuses.add(response.status_code)
+
+    # Память замеряется отдельно: трассировка сильно замедляет запросы.
+    peaks = []
+    for _ in range(memory_runs):
+        request = prepare()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            request()
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        finally:
+            tracemalloc.stop()
+
+    result = summarize(timings)
+    result.update({
+        'queries': statistics.median_low(queries),
+        'queries_max': max(queries),
+        'peak_kib': round(statistics.median(peaks) / 1024, 1)
+        if peaks else None,
+        'status': sorted(statuses),
+        'iterations': iterations,
+    })
+    return result
+
+
+def run(args):
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(
+            os.path.join(directory, 'views.sqlite3'),
+            DEBUG=False, ALLOWED_HOSTS=['testserver'],
+        )
+        started = time.perf_counter()
+        data = Dataset(
+            args.users, args.posts, args.comments,
+            args.detail_comments, args.seed
+        )
+        print(
+            f'Данные готовы за {time.perf_counter() - started:.1f} с',
+            file=sys.stderr
+        )
+        report = {
+            'environment': environment(),
+            'dataset': {
+                'users': args.users, 'posts': args.posts,
+                'comments': args.comments,
+                'detail_comments': args.detail_comments,
+                'seed': args.seed,
+            },
+            'cache': 'warm' if args.warm_cache else 'cold',
+            'scenarios': {},
+        }
+        for scenario in make_scenarios(data):
+            if args.only and scenario.name not in args.only:
+                continue
+            result = measure(
+                scenario, args.iterations, args.warmup,
+                args.memory_runs, args.warm_cache
+            )
+            report['scenarios'][scenario.name] = result
+            print(
+                f'{scenario.name:<18} p50 {result["p50_ms"]:8.2f} мс  '
+                f'p95 {result["p95_ms"]:8.2f} мс  '
+                f'запросов {result["queries"]:3}  '
+                f'память {result["peak_kib"]} КиБ',
+                file=sys.stderr
+            )
+    return report
+
+
+def change(old, new):
+    if not old:
+        return 0.0
+    return (new - old) / old
+
+
+def compare(old, new, threshold):
+    """Печатает сравнение двух отчётов; возвращает число регрессий."""
+    regressions = 0
+    print(
+        f'{"сценарий":<18} {"p50, мс":^17} {"p95, мс":^27} '
+        f'{"запросы":^9}'
+    )
+    for name, before in old['scenarios'].items():
+        after = new['scenarios'].get(name)
+        if after is None:
+            continue
+        p95 = change(before['p95_ms'], after['p95_ms'])
+        slower = p95 > threshold
+        more_queries = after['queries'] > before['queries']
+        regressions += slower or more_queries
+        print(
+            f'{name:<18} '
+            f'{before["p50_ms"]:7.2f} → {after["p50_ms"]:7.2f} '
+            f'{before["p95_ms"]:7.2f} → {after["p95_ms"]:7.2f} '
+            f'({p95:+6.1%}) '
+            f'{before["queries"]:3} → {after["queries"]:3}'
+            + ('  <- регрессия' if slower or more_queries else '')
+        )
+    if old.get('dataset') != new.get('dataset'):
+        print('Внимание: отчёты сняты на разных данных.')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--posts', type=int, default=10_000)
+    parser.add_argument('--comments', type=int, default=30_000)
+    parser.add_argument(
+        '--detail-comments', type=int, default=1000,
+        help='Сколько комментариев у публикации в сценарии post_detail.'
+    )
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument(
+        '--memory-runs', type=int, default=5,
+        help='Сколько запросов выполнить под tracemalloc; 0 — не мерить.'
+    )
+    parser.add_argument(
+        '--warm-cache', action='store_true',
+        help='Не очищать кеш перед запросами страниц.'
+    )
+    parser.add_argument(
+        '--only', nargs='+', metavar='SCENARIO',
+        help='Выполнить только указанные сценарии.'
+    )
+    parser.add_argument(
+        '--output', default='-', help='Куда записать JSON; "-" — stdout.'
+    )
+    parser.add_argument(
+        '--compare', nargs='+', metavar='REPORT',
+        help='Сравнить с отчётом; с двумя отчётами — только сравнить их.'
+    )
+    parser.add_argument(
+        '--threshold', type=float, default=DEFAULT_THRESHOLD,
+        help='Допустимый рост p95 при сравнении, доля (0.1 = 10%%).'
+    )
+    args = parser.parse_args()
+
+    if args.compare and len(args.compare) > 2:
+        parser.error('--compare принимает один или два отчёта.')
+    if args.compare and len(args.compare) == 2:
+        old, new = map(read_report, args.compare)
+    else:
+        new = run(args)
+        write_report(args.output, new)
+        if not args.compare:
+            return 0
+        old = read_report(args.compare[0])
+    return 1 if compare(old, new, args.threshold) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
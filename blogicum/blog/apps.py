@@ -5,3 +5,12 @@ class BlogConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "blog"
     verbose_name = 'Блог'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+
+        from . import checks, signals, tasks  # noqa: F401
+
+        post_migrate.connect(
+            signals.install_search_index_after_migrate, sender=self
+        )
@@ -0,0 +1,105 @@
+"""Массовая загрузка данных в обход save() и сигналов.
+
+Используется командами import_blog и generate_blog_data: они вставляют
+строки через bulk_create, поэтому производные данные (счётчики
+комментариев, кеши, горизонт публикации) нужно обновить отдельно.
+"""
+from contextlib import contextmanager
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, models
+
+from .cache import bump_card_generation
+from .models import Comment, Post
+from .publication import reset_window
+from .search import drop_search_triggers, install_search_index
+
+# Таблицы, индексы которых стоит строить после загрузки, а не по ходу.
+INDEXED_MODELS = (Post, Comment)
+
+
+def field_indexes(connection, model):
+    """Индексы отдельных полей (db_index), как они названы в базе."""
+    meta_names = {index.name for index in model._meta.indexes}
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, model._meta.db_table
+        )
+    columns = {
+        field.column: field for field in model._meta.concrete_fields
+        if field.db_index and not field.unique
+    }
+    for name, info in constraints.items():
+        if (not info['index'] or info['unique'] or info['primary_key']
+                or name in meta_names or len(info['columns']) != 1):
+            continue
+        field = columns.get(info['columns'][0])
+        if field is not None:
+            yield name, field
+
+
+@contextmanager
+def deferred_indexes(connection, model_list):
+    """Удаляет вторичные индексы на время загрузки и создаёт их заново.
+
+    Вставка в таблицу без индексов дешевле, а построить индекс
+    по готовым данным быстрее, чем обновлять его на каждой строке.
+    Полнотекстовый индекс перестраивается целиком по той же причине.
+    """
+    editor = connection.schema_editor()
+    dropped = []
+    try:
+        for model in model_list:
+            for index in model._meta.indexes:
+                editor.remove_index(model, index)
+                dropped.append((model, index, None))
+            for name, field in list(field_indexes(connection, model)):
+                editor.execute(editor._delete_index_sql(model, name))
+                dropped.append((model, name, field))
+        drop_search_triggers(connection)
+        yield
+    finally:
+        for model, index, field in dropped:
+            if field is None:
+                editor.add_index(model, index)
+            else:
+                editor.execute(editor._create_index_sql(
+                    model, fields=[field], name=index
+                ))
+        install_search_index(connection)
+
+
+def is_timestamp(field):
+    return isinstance(field, models.DateField) and (
+        field.auto_now or field.auto_now_add
+    )
+
+
+@contextmanager
+def raw_timestamps(model_list):
+    """Отключает auto_now и auto_now_add, чтобы сохранить даты из дампа.
+
+    bulk_create вызывает pre_save, и без этого created_at и updated_at
+    всех импортированных объектов стали бы временем импорта.
+    """
+    changed = []
+    for model in model_list:
+        for field in model._meta.concrete_fields:
+            if is_timestamp(field):
+                changed.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in changed:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def refresh_derived_data(using=DEFAULT_DB_ALIAS):
+    """Пересчитывает то, что при save() обновили бы сигналы."""
+    call_command(
+        'rebuild_comment_counts', database=using, stdout=StringIO()
+    )
+    reset_window()
+    bump_card_generation()
@@ -0,0 +1,115 @@
+import math
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from core.db.replicas import pin_seconds
+from .publication import next_publication_at
+
+CARD_GENERATION_KEY = 'blog:card:generation'
+PAGE_GROUP_KEY = 'blog:page-group:{}'
+PAGE_PURGED_KEY = 'blog:page-purged:{}'
+FEED_GROUP = 'feed'
+
+
+def card_timeout():
+    return getattr(settings, 'BLOG_CARD_CACHE_TIMEOUT', 60 * 60)
+
+
+def card_generation():
+    """Поколение карточек; меняется при правке категорий и мест."""
+    return cache.get_or_set(CARD_GENERATION_KEY, 1, None)
+
+
+def bump_card_generation():
+    try:
+        cache.incr(CARD_GENERATION_KEY)
+    except ValueError:
+        cache.set(CARD_GENERATION_KEY, 1, None)
+
+
+def post_card_version(post):
+    """Версия карточки из всего, что в ней выводится и не покрыто updated_at.
+
+    Правка самой публикации меняет `updated_at`, новый или удалённый
+    комментарий — `comment_count`; смена публикации категории или места
+    видна по флагам связанных объектов, загруженных через with_related().
+    """
+    category = post.category
+    location = post.location
+    parts = (
+        post.updated_at.timestamp(),
+        post.comment_count,
+        post.is_published,
+        post.has_image_variants,
+        post.author.username,
+        post.category_id,
+        category.is_published if category else None,
+        post.location_id,
+        location.is_published if location else None,
+    )
+    return md5(repr(parts).encode()).hexdigest()
+
+
+def post_card_key(post, generation=None):
+    if generation is None:
+        generation = card_generation()
+    return f'blog:card:{generation}:{post.pk}:{post_card_version(post)}'
+
+
+def category_group(slug):
+    return f'category:{slug}'
+
+
+def post_group(pk):
+    return f'post:{pk}'
+
+
+def purge_pages(*groups):
+    """Сбрасывает закешированные страницы перечисленных групп."""
+    for group in groups:
+        try:
+            cache.incr(PAGE_GROUP_KEY.format(group))
+        except ValueError:
+            cache.set(PAGE_GROUP_KEY.format(group), 1, None)
+    # Пока реплики догоняют основную базу, страницы этих групп,
+    # прочитанные с реплики, могут быть устаревшими.
+    lag = pin_seconds()
+    if lag:
+        cache.set_many(
+            {PAGE_PURGED_KEY.format(group): True for group in groups}, lag
+        )
+
+
+def recently_purged(groups):
+    keys = [PAGE_PURGED_KEY.format(group) for group in groups]
+    return bool(cache.get_many(keys))
+
+
+def page_cache_key(path, groups):
+    keys = [PAGE_GROUP_KEY.format(group) for group in groups]
+    versions = cache.get_many(keys)
+    parts = [str(versions.get(key, 0)) for key in keys]
+    # Правка категорий и мест меняет поколение карточек —
+    # и все страницы, где эти карточки выведены.
+    parts.append(str(card_generation()))
+    digest = md5(f'{path}:{":".join(parts)}'.encode()).hexdigest()
+    return f'blog:page:{digest}'
+
+
+def page_max_age():
+    return getattr(settings, 'BLOG_PAGE_CACHE_TIMEOUT', 5 * 60)
+
+
+def page_timeout():
+    """Время жизни страницы: не дольше, чем до ближайшей отложенной
+    публикации, чтобы она появилась в ленте вовремя.
+    """
+    timeout = page_max_age()
+    next_pub_date = next_publication_at()
+    if next_pub_date is not None:
+        seconds_left = (next_pub_date - timezone.now()).total_seconds()
+        timeout = min(timeout, math.floor(seconds_left))
+    return max(timeout, 0)
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Бэкенды, у которых каждый процесс видит только свои записи.
+PROCESS_LOCAL_CACHES = {
+    'django.core.cache.backends.locmem.LocMemCache',
+}
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Кеш страниц и его сброс по сигналам требуют общего кеша."""
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        'Кеш по умолчанию не общий для процессов.',
+        hint=(
+            'Сигналы сбрасывают кеш страниц, карточек и горизонт '
+            'публикации только в том процессе, где изменили данные; '
+            'остальные отдают устаревшие страницы до истечения TTL. '
+            'Настройте FileBasedCache, Memcached или Redis либо '
+            'запускайте блог в одном процессе.'
+        ),
+        id='blog.W001',
+    )]
@@ -1,5 +1,7 @@
 from django import forms
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_image_file_extension
 from .models import Category, Location, Post, Comment
 
 
@@ -30,7 +32,35 @@ class LocationForm(forms.ModelForm):
         fields = '__all__'
 
 
+class StreamedImageField(forms.FileField):
+    """Поле для файлов, принятых StreamingImageUploadHandler.
+
+    Использует то, что обработчик узнал при приёме файла: ошибки
+    лимитов и размер изображения из заголовка.
+    """
+
+    def to_python(self, data):
+        error = getattr(data, 'upload_error', None)
+        if error:
+            raise ValidationError(error, code='upload')
+        if hasattr(data, 'image_size') and data.image_size is None:
+            raise ValidationError(
+                'Загрузите правильное изображение.', code='invalid_image'
+            )
+        return super().to_python(data)
+
+
 class PostForm(forms.ModelForm):
+    # Вместо forms.ImageField, который декодирует файл прямо в запросе,
+    # здесь проверяются только заголовок и расширение; сам файл
+    # проверяет и обрабатывает фоновая задача process_post_image.
+    image = StreamedImageField(
+        required=False,
+        label='Фото',
+        validators=[validate_image_file_extension],
+        widget=forms.ClearableFileInput(attrs={'accept': 'image/*'})
+    )
+
     class Meta:
         model = Post
         fields = ['title', 'text', 'pub_date', 'location', 'category', 'image']
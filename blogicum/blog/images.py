@@ -0,0 +1,163 @@
+"""Уменьшенные копии изображений публикаций.
+
+Для каждого загруженного изображения заранее готовятся варианты
+нескольких ширин в JPEG и WebP. Имена вариантов выводятся из имени
+оригинала, поэтому их не нужно хранить в базе — достаточно флага
+`Post.has_image_variants`. Оригинал отдаётся только по клику.
+"""
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+# Название варианта -> максимальная ширина в пикселях. Карточка
+# и страница публикации имеют ширину 40rem (640px); вариант detail
+# нужен для экранов с двойной плотностью пикселей.
+VARIANT_WIDTHS = {
+    'card': 640,
+    'detail': 1280,
+}
+
+# Формат -> (расширение, параметры сохранения Pillow).
+VARIANT_FORMATS = {
+    'jpeg': ('jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'webp': ('webp', {'quality': 80, 'method': 4}),
+}
+
+VARIANTS_DIR = 'variants'
+
+# Ключи Image.info, из-за которых оригинал нужно пересохранить.
+METADATA_KEYS = {'exif', 'xmp', 'XML:com.adobe.xmp', 'comment'}
+
+
+def variant_name(image_name, variant, fmt):
+    """Имя варианта: posts_images/a.png -> posts_images/variants/a-card.jpg."""
+    path = PurePosixPath(image_name)
+    extension = VARIANT_FORMATS[fmt][0]
+    name = f'{path.stem}-{variant}.{extension}'
+    return str(path.parent / VARIANTS_DIR / name)
+
+
+def variant_names(image_name):
+    return [
+        variant_name(image_name, variant, fmt)
+        for variant in VARIANT_WIDTHS
+        for fmt in VARIANT_FORMATS
+    ]
+
+
+def resize(image, width):
+    """Уменьшает изображение до ширины `width`, не увеличивая мелкие."""
+    if image.width <= width:
+        return image.copy()
+    height = round(image.height * width / image.width)
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def encode(image, fmt):
+    extension, options = VARIANT_FORMATS[fmt]
+    if fmt == 'jpeg' and image.mode != 'RGB':
+        # В JPEG нет прозрачности: накладываем изображение на белый фон.
+        background = Image.new('RGB', image.size, 'white')
+        rgba = image.convert('RGBA')
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        image = background
+    elif fmt == 'webp' and image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    buffer = BytesIO()
+    image.save(buffer, format=fmt.upper(), **options)
+    return buffer.getvalue()
+
+
+def replace_file(name, content, storage=default_storage):
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(content))
+
+
+def generate_variants(image_file, storage=default_storage):
+    """Сохраняет все варианты изображения.
+
+    Имя оригинала определяется содержимым, поэтому готовые варианты
+    одинаковой картинки не пересоздаются. Возвращает False, если файл
+    не удалось прочитать как изображение.
+    """
+    if all(storage.exists(name) for name in variant_names(image_file.name)):
+        return True
+    try:
+        image_file.open('rb')
+        with Image.open(image_file) as original:
+            original = ImageOps.exif_transpose(original)
+            for variant, width in VARIANT_WIDTHS.items():
+                resized = resize(original, width)
+                for fmt in VARIANT_FORMATS:
+                    replace_file(
+                        variant_name(image_file.name, variant, fmt),
+                        encode(resized, fmt),
+                        storage
+                    )
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return False
+    finally:
+        image_file.close()
+    return True
+
+
+def strip_metadata(image_file):
+    """Проверяет оригинал и сохраняет его копию без EXIF и метаданных.
+
+    Поворот из EXIF применяется к пикселям, чтобы фото не легло набок.
+    Анимированные изображения не трогаем, чтобы не потерять кадры.
+    Возвращает имя очищенного файла: у содержимого новый хеш,
+    а значит, и новое имя.
+    """
+    try:
+        image_file.open('rb')
+        with Image.open(image_file) as image:
+            image.verify()
+        image_file.seek(0)
+        with Image.open(image_file) as image:
+            if getattr(image, 'is_animated', False):
+                return image_file.name
+            if not METADATA_KEYS & image.info.keys():
+                return image_file.name
+            # MPO — JPEG со служебными кадрами, сохраняем как обычный JPEG.
+            fmt = 'JPEG' if image.format == 'MPO' else image.format
+            cleaned = ImageOps.exif_transpose(image)
+            if fmt == 'JPEG' and cleaned.mode not in ('RGB', 'L', 'CMYK'):
+                cleaned = cleaned.convert('RGB')
+            buffer = BytesIO()
+            options = {'quality': 95} if fmt == 'JPEG' else {}
+            cleaned.save(buffer, format=fmt, **options)
+    except (OSError, ValueError, SyntaxError,
+            Image.DecompressionBombError) as error:
+        raise ValidationError(
+            'Загруженный файл не является корректным изображением.'
+        ) from error
+    finally:
+        image_file.close()
+    return image_file.storage.save(
+        image_file.name, ContentFile(buffer.getvalue())
+    )
+
+
+def variant_urls(image_name, storage=default_storage):
+    """URL вариантов: {'card': {'jpeg': ..., 'webp': ...}, ...}."""
+    return {
+        variant: {
+            fmt: storage.url(variant_name(image_name, variant, fmt))
+            for fmt in VARIANT_FORMATS
+        }
+        for variant in VARIANT_WIDTHS
+    }
+
+
+def srcset(urls, fmt):
+    """Значение атрибута srcset для формата `fmt`."""
+    return ', '.join(
+        f'{urls[variant][fmt]} {width}w'
+        for variant, width in VARIANT_WIDTHS.items()
+    )
@@ -0,0 +1,141 @@
+"""Очередь фоновых задач в базе данных.
+
+Задачи — строки модели `Job`; их выполняет `manage.py runworker`,
+отдельный брокер не нужен. Обработчик регистрируется декоратором
+`@job('имя')` и получает экземпляр `Job`.
+
+Воркер забирает задачу условным UPDATE (`status='queued'` → `running`),
+поэтому несколько воркеров не выполнят одну задачу дважды и без
+`SELECT ... FOR UPDATE`, которого нет в SQLite.
+
+Повтор после временной ошибки откладывается на
+`BLOG_JOBS_RETRY_DELAY` секунд, умноженных на номер попытки, — иначе
+тот же проход воркера сразу забрал бы задачу снова и истратил все
+попытки за миллисекунды.
+
+При `BLOG_JOBS_EAGER = True` задача выполняется сразу после коммита
+транзакции, в которой поставлена, — удобно для разработки без воркера.
+"""
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+HANDLERS = {}
+
+
+def job(name):
+    """Регистрирует обработчик задачи `name`."""
+    def register(handler):
+        HANDLERS[name] = handler
+        return handler
+    return register
+
+
+def max_attempts():
+    return getattr(settings, 'BLOG_JOBS_MAX_ATTEMPTS', 3)
+
+
+def retry_delay(attempts):
+    delay = getattr(settings, 'BLOG_JOBS_RETRY_DELAY', 30)
+    return timedelta(seconds=delay * attempts)
+
+
+def enqueue(name, post=None, **payload):
+    if name not in HANDLERS:
+        raise KeyError(f'Неизвестная задача: {name}')
+    queued = Job.objects.create(name=name, post=post, payload=payload)
+    if getattr(settings, 'BLOG_JOBS_EAGER', False):
+        transaction.on_commit(lambda: claim_and_run(queued.pk))
+    return queued
+
+
+def claim(pk):
+    """Переводит задачу в статус running, если её не забрал другой воркер."""
+    return Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+        status=Job.RUNNING,
+        started_at=timezone.now(),
+        attempts=F('attempts') + 1
+    ) == 1
+
+
+def claim_next():
+    queued = Job.objects.filter(
+        status=Job.QUEUED, run_after__lte=timezone.now()
+    ).order_by('id')
+    for pk in queued.values_list('pk', flat=True)[:10]:
+        if claim(pk):
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def claim_and_run(pk):
+    if claim(pk):
+        run(Job.objects.get(pk=pk))
+
+
+def run(claimed):
+    """Выполняет забранную задачу и записывает результат.
+
+    `ValidationError` означает, что повтор не поможет; прочие ошибки
+    возвращают задачу в очередь, пока не исчерпаны попытки.
+    """
+    try:
+        HANDLERS[claimed.name](claimed)
+    except Exception as error:
+        permanent = isinstance(error, ValidationError)
+        if permanent or claimed.attempts >= max_attempts():
+            claimed.status = Job.FAILED
+        else:
+            claimed.status = Job.QUEUED
+            claimed.run_after = timezone.now() + retry_delay(
+                claimed.attempts
+            )
+        claimed.error = (
+            '; '.join(error.messages) if permanent
+            else traceback.format_exc()
+        )
+    else:
+        claimed.status = Job.DONE
+        claimed.error = ''
+    claimed.finished_at = timezone.now()
+    claimed.save(
+        update_fields=['status', 'error', 'run_after', 'finished_at']
+    )
+    return claimed
+
+
+def run_pending(limit=None):
+    """Выполняет задачи из очереди; возвращает число выполненных."""
+    done = 0
+    while limit is None or done < limit:
+        claimed = claim_next()
+        if claimed is None:
+            break
+        run(claimed)
+        done += 1
+    return done
+
+
+def requeue_stale(seconds):
+    """Возвращает в очередь задачи, чей воркер, видимо, завершился аварийно.
+
+    Задача, исчерпавшая попытки, — например, каждый раз убивающая
+    воркер нехваткой памяти, — помечается ошибкой, а не повторяется
+    при каждом перезапуске.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=Job.RUNNING, started_at__lt=now - timedelta(seconds=seconds)
+    )
+    stale.filter(attempts__gte=max_attempts()).update(
+        status=Job.FAILED, finished_at=now,
+        error='Воркер завершился во время выполнения задачи.'
+    )
+    return stale.update(status=Job.QUEUED, run_after=now)
@@ -0,0 +1,75 @@
+import posixpath
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+from django.utils import timezone
+
+from blog.images import variant_names
+from blog.models import Job, Post
+from blog.storage import get_post_image_storage
+
+IMAGES_DIR = 'posts_images'
+
+
+def walk(storage, directory):
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield posixpath.join(directory, name)
+    for name in directories:
+        yield from walk(storage, posixpath.join(directory, name))
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет фото и их копии, на которые не ссылается ни одна '
+        'публикация или задача в очереди.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age', type=int, default=3600,
+            help='Не трогать файлы моложе стольких секунд: их могли '
+                 'только что загрузить для ещё не сохранённой публикации.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, что будет удалено.'
+        )
+
+    def referenced_names(self):
+        names = set(
+            Post.objects.exclude(image='').values_list('image', flat=True)
+        )
+        for payload in Job.objects.filter(
+                status__in=[Job.QUEUED, Job.RUNNING]
+        ).values_list('payload', flat=True):
+            if payload.get('image'):
+                names.add(payload['image'])
+        for name in list(names):
+            names.update(variant_names(name))
+        return names
+
+    def handle(self, *args, **options):
+        storage = get_post_image_storage()
+        if not storage.exists(IMAGES_DIR):
+            return
+        referenced = self.referenced_names()
+        threshold = timezone.now() - timedelta(seconds=options['min_age'])
+        removed = freed = 0
+        for name in walk(storage, IMAGES_DIR):
+            if name in referenced:
+                continue
+            if storage.get_modified_time(name) > threshold:
+                continue
+            size = storage.size(name)
+            if options['dry_run']:
+                self.stdout.write(name)
+            else:
+                storage.delete(name)
+            removed += 1
+            freed += size
+        verb = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} файлов: {removed} ({filesizeformat(freed)})'
+        ))
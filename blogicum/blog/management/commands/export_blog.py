@@ -0,0 +1,112 @@
+import time
+from datetime import datetime, time as day_time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from blog.dump import iter_rows, open_dump, write_ndjson
+from blog.models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+
+def parse_moment(value, end_of_day=False):
+    """Дата или дата со временем из аргумента командной строки."""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f'Неверная дата: {value}')
+        moment = datetime.combine(
+            day, day_time.max if end_of_day else day_time.min
+        )
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает публикации и комментарии в NDJSON по частям, '
+        'не загружая таблицы в память. Результат читает import_blog.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Куда писать; имя на .gz — сжать gzip, '
+                         '"-" — stdout.'
+        )
+        parser.add_argument(
+            '--category', action='append', default=[],
+            help='Slug категории; можно указать несколько раз.'
+        )
+        parser.add_argument(
+            '--author', action='append', default=[],
+            help='Имя пользователя автора; можно указать несколько раз.'
+        )
+        parser.add_argument(
+            '--since', help='Публикации с этой даты (pub_date), включительно.'
+        )
+        parser.add_argument(
+            '--until', help='Публикации по эту дату (pub_date), включительно.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Сколько строк читать из базы за раз.'
+        )
+        parser.add_argument(
+            '--no-related', action='store_true',
+            help='Не выгружать категории, места и пользователей, '
+                 'на которых ссылаются публикации и комментарии.'
+        )
+
+    def get_posts(self, options):
+        posts = Post.objects.all()
+        if options['category']:
+            posts = posts.filter(category__slug__in=options['category'])
+        if options['author']:
+            posts = posts.filter(author__username__in=options['author'])
+        if options['since']:
+            posts = posts.filter(pub_date__gte=parse_moment(options['since']))
+        if options['until']:
+            posts = posts.filter(
+                pub_date__lte=parse_moment(options['until'], end_of_day=True)
+            )
+        return posts
+
+    def handle(self, *args, **options):
+        posts = self.get_posts(options)
+        post_ids = posts.values('pk')
+        comments = Comment.objects.filter(post__in=post_ids)
+        # Связанные объекты отбираются подзапросами, поэтому их id
+        # тоже не собираются в памяти.
+        querysets = []
+        if not options['no_related']:
+            querysets += [
+                Category.objects.filter(pk__in=posts.values('category')),
+                Location.objects.filter(pk__in=posts.values('location')),
+                User.objects.filter(
+                    Q(pk__in=posts.values('author'))
+                    | Q(pk__in=comments.values('author'))
+                ),
+            ]
+        querysets += [posts, comments]
+
+        started = time.perf_counter()
+        chunk_size = options['chunk_size']
+        counts = []
+        with open_dump(options['path'], 'wt') as stream:
+            for queryset in querysets:
+                count = write_ndjson(stream, iter_rows(queryset, chunk_size))
+                counts.append((queryset.model._meta.label_lower, count))
+        elapsed = time.perf_counter() - started
+
+        for label, count in counts:
+            self.stderr.write(f'{label}: {count}')
+        total = sum(count for label, count in counts)
+        self.stderr.write(self.style.SUCCESS(
+            f'Выгружено объектов: {total} за {elapsed:.1f} с'
+        ))
@@ -0,0 +1,285 @@
+import random
+import time
+from array import array
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries, transaction
+from django.utils import timezone
+from faker import Faker
+
+from blog.bulk import (
+    INDEXED_MODELS, deferred_indexes, raw_timestamps, refresh_derived_data
+)
+from blog.models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+# Доли «особых» объектов; остальное — обычные опубликованные данные.
+UNPUBLISHED_CATEGORY_SHARE = 0.1
+UNPUBLISHED_LOCATION_SHARE = 0.1
+UNPUBLISHED_POST_SHARE = 0.03
+SCHEDULED_POST_SHARE = 0.05
+NO_LOCATION_SHARE = 0.3
+
+# Публикации распределены по последним HISTORY_DAYS дням,
+# отложенные — по следующим SCHEDULE_DAYS.
+HISTORY_DAYS = 3 * 365
+SCHEDULE_DAYS = 60
+
+# Faker медленный, поэтому тексты собираются из заранее
+# сгенерированных предложений.
+SENTENCE_POOL_SIZE = 2000
+
+
+def zipf_weights(count, exponent=1.0):
+    """Накопленные веса закона Ципфа: первые элементы — самые популярные."""
+    return list(accumulate(1 / rank ** exponent
+                           for rank in range(1, count + 1)))
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими данными с реалистичными '
+        'перекосами: популярные авторы и категории, «горячие» публикации, '
+        'отложенные публикации и скрытые категории.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=5000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--locations', type=int, default=50)
+        parser.add_argument(
+            '--seed', type=int, default=None,
+            help='Зерно генератора: одинаковое зерно — одинаковые данные.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Сколько объектов вставлять в одной транзакции.'
+        )
+        parser.add_argument(
+            '--defer-indexes', action='store_true',
+            help='Удалить вторичные индексы публикаций и комментариев '
+                 'на время вставки и построить их в конце.'
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 and (options['posts'] or options['comments']):
+            raise CommandError('Публикациям и комментариям нужны авторы.')
+        if options['categories'] < 1 and options['posts']:
+            raise CommandError('Публикациям нужны категории.')
+        self.random = random.Random(options['seed'])
+        self.faker = Faker('ru_RU')
+        self.faker.seed_instance(options['seed'])
+        self.batch_size = options['batch_size']
+        self.verbosity = options['verbosity']
+        self.now = timezone.now()
+        self.sentences = [
+            self.faker.sentence(nb_words=self.random.randint(4, 12))
+            for _ in range(SENTENCE_POOL_SIZE)
+        ]
+        self.created = {}
+
+        defer = (
+            deferred_indexes(connection, INDEXED_MODELS)
+            if options['defer_indexes'] else nullcontext()
+        )
+        started = time.perf_counter()
+        with raw_timestamps([Category, Location, Post, Comment]), defer:
+            categories = self.create_categories(options['categories'])
+            locations = self.create_locations(options['locations'])
+            users = self.create_users(options['users'])
+            posts = self.create_posts(
+                options['posts'], users, categories, locations
+            )
+            self.create_comments(options['comments'], users, posts)
+        refresh_derived_data()
+
+        elapsed = time.perf_counter() - started
+        total = sum(self.created.values())
+        for label, count in self.created.items():
+            self.stdout.write(f'{label}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано объектов: {total} за {elapsed:.1f} с '
+            f'({total / elapsed if elapsed else 0:.0f} строк/с)'
+        ))
+
+    def text(self, low, high):
+        return ' '.join(self.random.choices(
+            self.sentences, k=self.random.randint(low, high)
+        ))
+
+    def past(self, days=HISTORY_DAYS):
+        return self.now - timedelta(seconds=self.random.uniform(
+            0, days * 24 * 3600
+        ))
+
+    def insert(self, model, objects):
+        """Вставляет объекты пакетами; возвращает новые первичные ключи.
+
+        SQLite не возвращает ключи из bulk_create, поэтому они
+        выбираются запросом по ключам больше прежнего максимума.
+        """
+        last = self.last_pk(model)
+        batch = []
+        count = 0
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                count += self.flush(model, batch)
+                batch = []
+        count += self.flush(model, batch)
+        self.created[model._meta.label_lower] = count
+        return array('q', model.objects.filter(pk__gt=last).order_by(
+            'pk'
+        ).values_list('pk', flat=True))
+
+    def last_pk(self, model):
+        return model.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+
+    def flush(self, model, batch):
+        if not batch:
+            return 0
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+        # При DEBUG = True Django копит все запросы в connection.queries.
+        reset_queries()
+        if self.verbosity >= 2:
+            self.stdout.write(f'{model._meta.label_lower}: +{len(batch)}')
+        return len(batch)
+
+    def create_categories(self, count):
+        # Номера продолжают уже созданные: команду можно запускать повторно.
+        start = self.last_pk(Category) + 1
+        return self.insert(Category, (
+            Category(
+                title=self.faker.word().capitalize()[:256],
+                description=self.text(1, 3),
+                slug=f'category-{index}',
+                is_published=(
+                    self.random.random() >= UNPUBLISHED_CATEGORY_SHARE
+                ),
+                created_at=self.past(),
+            )
+            for index in range(start, start + count)
+        ))
+
+    def create_locations(self, count):
+        return self.insert(Location, (
+            Location(
+                name=self.faker.city(),
+                is_published=(
+                    self.random.random() >= UNPUBLISHED_LOCATION_SHARE
+                ),
+                created_at=self.past(),
+            )
+            for _ in range(count)
+        ))
+
+    def create_users(self, count):
+        # Хеширование пароля намеренно медленное: один хеш на всех.
+        password = make_password('password')
+        start = self.last_pk(User) + 1
+        return self.insert(User, (
+            User(
+                username=f'user_{index}',
+                first_name=self.faker.first_name(),
+                last_name=self.faker.last_name(),
+                email=f'user_{index}@example.com',
+                password=password,
+                date_joined=self.past(),
+            )
+            for index in range(start, start + count)
+        ))
+
+    def create_posts(self, count, users, categories, locations):
+        """Создаёт публикации; возвращает их ключи и даты публикации."""
+        author_weights = zipf_weights(len(users))
+        category_weights = zipf_weights(len(categories), exponent=0.8)
+        # Популярность не должна совпадать с порядком создания.
+        authors = self.random.sample(list(users), len(users))
+        pub_dates = array('d')
+
+        def posts():
+            for _ in range(count):
+                if self.random.random() < SCHEDULED_POST_SHARE:
+                    pub_date = self.now + timedelta(
+                        seconds=self.random.uniform(
+                            60, SCHEDULE_DAYS * 24 * 3600
+                        )
+                    )
+                else:
+                    pub_date = self.past()
+                pub_dates.append(pub_date.timestamp())
+                location = None
+                if locations and self.random.random() >= NO_LOCATION_SHARE:
+                    location = self.random.choice(locations)
+                yield Post(
+                    title=self.text(1, 1)[:256],
+                    text=self.text(3, 30),
+                    pub_date=pub_date,
+                    author_id=self.random.choices(
+                        authors, cum_weights=author_weights
+                    )[0],
+                    category_id=self.random.choices(
+                        categories, cum_weights=category_weights
+                    )[0],
+                    location_id=location,
+                    is_published=(
+                        self.random.random() >= UNPUBLISHED_POST_SHARE
+                    ),
+                    created_at=min(pub_date, self.now),
+                    updated_at=min(pub_date, self.now),
+                )
+
+        return self.insert(Post, posts()), pub_dates
+
+    def create_comments(self, count, users, posts):
+        """Комментарии достаются в основном «горячим» публикациям."""
+        keys, pub_dates = posts
+        now = self.now.timestamp()
+        past = [
+            (pk, pub_date) for pk, pub_date in zip(keys, pub_dates)
+            if pub_date < now
+        ]
+        if not past or not users:
+            self.created[Comment._meta.label_lower] = 0
+            return
+        self.random.shuffle(past)
+        post_weights = zipf_weights(len(past))
+        author_weights = zipf_weights(len(users), exponent=0.7)
+        authors = self.random.sample(list(users), len(users))
+        timezone_info = self.now.tzinfo
+
+        def comments():
+            for _ in range(count):
+                post, pub_date = self.random.choices(
+                    past, cum_weights=post_weights
+                )[0]
+                # Большинство комментариев пишут в первые дни.
+                delay = min(
+                    self.random.expovariate(1 / (2 * 24 * 3600)),
+                    now - pub_date
+                )
+                created_at = datetime.fromtimestamp(
+                    pub_date + delay, timezone_info
+                )
+                yield Comment(
+                    post_id=post,
+                    author_id=self.random.choices(
+                        authors, cum_weights=author_weights
+                    )[0],
+                    text=self.text(1, 4),
+                    is_published=True,
+                    created_at=created_at,
+                )
+
+        self.insert(Comment, comments())
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import bump_card_generation
+from blog.images import generate_variants
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Готовит уменьшенные копии фото для публикаций, где их нет.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересоздать копии и у публикаций, где они уже есть.'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').only('image')
+        if not options['all']:
+            posts = posts.filter(has_image_variants=False)
+        done = failed = 0
+        for post in posts.iterator():
+            if generate_variants(post.image):
+                Post.objects.filter(pk=post.pk).update(has_image_variants=True)
+                done += 1
+            else:
+                failed += 1
+                self.stderr.write(f'Не удалось обработать {post.image.name}')
+        if done:
+            # Карточки и страницы должны сослаться на новые копии.
+            bump_card_generation()
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано фото: {done}, с ошибками: {failed}'
+        ))
@@ -0,0 +1,145 @@
+import time
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import (
+    DEFAULT_DB_ALIAS, IntegrityError, connections, reset_queries, transaction
+)
+
+from blog.bulk import (
+    INDEXED_MODELS, deferred_indexes, raw_timestamps, refresh_derived_data
+)
+from blog.dump import DUMP_MODELS, RowBuilder, iter_objects, open_dump
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает дамп категорий, мест, пользователей, публикаций '
+        'и комментариев (JSON-массив или NDJSON, можно сжатый) '
+        'пакетами через bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Файл дампа: .json, .ndjson, .gz, .bz2, .xz; '
+                         '"-" — stdin.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Сколько объектов одной модели вставлять в одной '
+                 'транзакции.'
+        )
+        parser.add_argument(
+            '--defer-indexes', action='store_true',
+            help='Удалить вторичные индексы публикаций и комментариев '
+                 'на время загрузки и построить их в конце.'
+        )
+        parser.add_argument(
+            '--ignore-conflicts', action='store_true',
+            help='Пропускать объекты, которые уже есть в базе.'
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Псевдоним базы данных.'
+        )
+
+    def handle(self, *args, **options):
+        self.using = options['database']
+        self.batch_size = options['batch_size']
+        self.verbosity = options['verbosity']
+        self.ignore_conflicts = options['ignore_conflicts']
+        connection = connections[self.using]
+        self.builders = {
+            label: RowBuilder(apps.get_model(label)) for label in DUMP_MODELS
+        }
+        self.pending = defaultdict(list)
+        self.loaded = Counter()
+        skipped = Counter()
+        model_list = [builder.model for builder in self.builders.values()]
+
+        defer = (
+            deferred_indexes(connection, INDEXED_MODELS)
+            if options['defer_indexes'] else nullcontext()
+        )
+        started = time.perf_counter()
+        with open_dump(options['path']) as stream, \
+                raw_timestamps(model_list), \
+                connection.constraint_checks_disabled(), defer:
+            for data in iter_objects(stream):
+                label = str(data.get('model', '')).lower()
+                if label not in self.builders:
+                    skipped[label] += 1
+                    continue
+                self.pending[label].append(self.builders[label].build(data))
+                if len(self.pending[label]) >= self.batch_size:
+                    self.flush(label)
+            for label in DUMP_MODELS:
+                self.flush(label)
+        loaded_at = time.perf_counter()
+
+        try:
+            connection.check_constraints(
+                table_names=[model._meta.db_table for model in model_list]
+            )
+        except Exception as error:
+            raise CommandError(
+                f'Дамп ссылается на отсутствующие объекты: {error}. '
+                'Загруженные строки сохранены.'
+            )
+        self.reset_sequences(connection, model_list)
+        if self.loaded['blog.post'] or self.loaded['blog.comment']:
+            refresh_derived_data(self.using)
+
+        total = sum(self.loaded.values())
+        elapsed = loaded_at - started
+        for label in DUMP_MODELS:
+            self.stdout.write(f'{label}: {self.loaded[label]}')
+        for label, count in sorted(skipped.items()):
+            self.stdout.write(f'Пропущено {label}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено объектов: {total} за {elapsed:.1f} с '
+            f'({total / elapsed if elapsed else 0:.0f} строк/с), '
+            f'пересчёт и проверки — {time.perf_counter() - loaded_at:.1f} с'
+        ))
+
+    def flush(self, label):
+        rows = self.pending.pop(label, None)
+        if not rows:
+            return
+        builder = self.builders[label]
+        instances = [instance for instance, links in rows]
+        try:
+            with transaction.atomic(using=self.using):
+                builder.model.objects.using(self.using).bulk_create(
+                    instances, ignore_conflicts=self.ignore_conflicts
+                )
+                through = defaultdict(list)
+                for instance, links in rows:
+                    if links and instance.pk is not None:
+                        for row in builder.through_rows(instance, links):
+                            through[type(row)].append(row)
+                for model, through_rows in through.items():
+                    model.objects.using(self.using).bulk_create(
+                        through_rows, ignore_conflicts=self.ignore_conflicts
+                    )
+        except IntegrityError as error:
+            raise CommandError(
+                f'{label}: {error}. Уже загруженные пакеты сохранены; '
+                'повторите с --ignore-conflicts, чтобы пропустить '
+                'существующие объекты.'
+            )
+        self.loaded[label] += len(rows)
+        # При DEBUG = True Django копит все запросы в connection.queries.
+        reset_queries()
+        if self.verbosity >= 2:
+            self.stdout.write(f'{label}: {self.loaded[label]}')
+
+    def reset_sequences(self, connection, model_list):
+        sql = connection.ops.sequence_reset_sql(no_style(), model_list)
+        if sql:
+            with connection.cursor() as cursor:
+                for line in sql:
+                    cursor.execute(line)
@@ -0,0 +1,88 @@
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from blog.cache import (
+    FEED_GROUP, category_group, page_max_age, post_group, purge_pages
+)
+from blog.models import Post
+from blog.publication import refresh_window, window_max_age
+
+# До какого pub_date страницы уже сброшены. Хранится без срока, но
+# может пропасть из кеша — тогда см. Command.processed_since().
+PROCESSED_KEY = 'blog:publication-processed'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сдвигает горизонт публикации и сбрасывает кеш страниц, '
+        'на которых должны появиться отложенные публикации.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, просыпаясь к каждому горизонту.'
+        )
+        parser.add_argument(
+            '--max-sleep', type=float,
+            help=(
+                'Максимальная пауза между проверками в режиме --loop, с; '
+                'по умолчанию половина BLOG_PUBLICATION_WINDOW_MAX_AGE.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        max_sleep = options['max_sleep']
+        if max_sleep is None:
+            max_sleep = window_max_age() / 2
+        elif max_sleep >= window_max_age():
+            raise CommandError(
+                '--max-sleep должен быть меньше '
+                'BLOG_PUBLICATION_WINDOW_MAX_AGE, иначе окно публикации '
+                'истекает раньше следующей проверки.'
+            )
+        while True:
+            horizon = self.advance()
+            if not options['loop']:
+                return
+            pause = max_sleep
+            if horizon is not None:
+                seconds_left = (horizon - timezone.now()).total_seconds()
+                pause = min(pause, max(seconds_left, 0))
+            time.sleep(pause)
+
+    def processed_since(self, cutoff):
+        """С какого pub_date искать публикации, чьи страницы не сброшены.
+
+        Если отметка пропала из кеша, берём срок жизни страницы:
+        страница, закешированная раньше, уже истекла сама.
+        """
+        processed = cache.get(PROCESSED_KEY)
+        if processed is None:
+            processed = cutoff - timedelta(seconds=page_max_age())
+        return processed
+
+    def advance(self):
+        cutoff, horizon = refresh_window()
+        published = list(Post.objects.filter(
+            is_published=True,
+            pub_date__gt=self.processed_since(cutoff),
+            pub_date__lte=cutoff
+        ).values_list('pk', 'category__slug'))
+        if published:
+            groups = {FEED_GROUP}
+            for pk, slug in published:
+                groups.add(post_group(pk))
+                if slug:
+                    groups.add(category_group(slug))
+            purge_pages(*groups)
+            self.stdout.write(
+                f'Опубликовано отложенных постов: {len(published)}'
+            )
+        cache.set(PROCESSED_KEY, cutoff, None)
+        self.stdout.write(f'Следующий горизонт: {horizon or "нет"}')
+        return horizon
@@ -0,0 +1,114 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.querylog import read_stats, stats_path
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def aggregate(summaries, only_views):
+    """Сводит строки журнала по представлениям и по тексту SQL."""
+    views = defaultdict(lambda: {'durations': [], 'queries': []})
+    slow = {}
+    repeated = {}
+    for summary in summaries:
+        if only_views and summary['view'] not in only_views:
+            continue
+        view = views[summary['view']]
+        view['durations'].append(summary['duration_ms'])
+        view['queries'].append(summary['queries'])
+        for query in summary['slow']:
+            entry = slow.setdefault((summary['view'], query['sql']), {
+                'count': 0, 'max_ms': 0, 'origin': query['origin']
+            })
+            entry['count'] += 1
+            entry['max_ms'] = max(entry['max_ms'], query['ms'])
+        for query in summary['repeated']:
+            entry = repeated.setdefault((summary['view'], query['sql']), {
+                'requests': 0, 'max_count': 0, 'origin': query['origin']
+            })
+            entry['requests'] += 1
+            entry['max_count'] = max(entry['max_count'], query['count'])
+    return views, slow, repeated
+
+
+class Command(BaseCommand):
+    help = (
+        'Сводка журнала запросов (BLOG_QUERY_STATS_PATH): число SQL '
+        'по представлениям, медленные и повторяющиеся запросы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', help='Файл статистики вместо BLOG_QUERY_STATS_PATH.'
+        )
+        parser.add_argument(
+            '--view', action='append', default=[],
+            help='Только это представление (например, blog:index).'
+        )
+        parser.add_argument(
+            '--top', type=int, default=10,
+            help='Сколько медленных и повторяющихся запросов показать.'
+        )
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Очистить файл после вывода сводки.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path'] or stats_path()
+        if path is None:
+            raise CommandError('Не задан BLOG_QUERY_STATS_PATH.')
+        try:
+            views, slow, repeated = aggregate(
+                read_stats(path), options['view']
+            )
+        except FileNotFoundError:
+            raise CommandError(f'Файл {path} не найден.')
+        self.write_views(views)
+        self.write_slow(slow, options['top'])
+        self.write_repeated(repeated, options['top'])
+        if options['clear']:
+            open(path, 'w').close()
+
+    def write_views(self, views):
+        self.stdout.write(
+            f'{"представление":<32} {"запросов":>8} {"SQL ср.":>8} '
+            f'{"SQL макс":>8} {"p95, мс":>9}'
+        )
+        for name, view in sorted(
+                views.items(), key=lambda item: -sum(item[1]['queries'])):
+            queries = view['queries']
+            self.stdout.write(
+                f'{name:<32} {len(queries):>8} '
+                f'{sum(queries) / len(queries):>8.1f} {max(queries):>8} '
+                f'{percentile(view["durations"], 0.95):>9.1f}'
+            )
+
+    def write_slow(self, slow, top):
+        if not slow:
+            return
+        self.stdout.write('\nМедленные запросы:')
+        for (view, sql), entry in sorted(
+                slow.items(), key=lambda item: -item[1]['max_ms'])[:top]:
+            self.stdout.write(
+                f'{entry["max_ms"]:.1f} мс, {entry["count"]} раз, '
+                f'{view} ({entry["origin"]}): {sql}'
+            )
+
+    def write_repeated(self, repeated, top):
+        if not repeated:
+            return
+        self.stdout.write('\nПовторяющиеся запросы:')
+        for (view, sql), entry in sorted(
+                repeated.items(),
+                key=lambda item: -item[1]['requests'])[:top]:
+            self.stdout.write(
+                f'до {entry["max_count"]} раз за запрос '
+                f'в {entry["requests"]} запросах, '
+                f'{view} ({entry["origin"]}): {sql}'
+            )
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='has_image_variants',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Есть уменьшенные копии фото'),
+        ),
+    ]
@@ -1,5 +1,9 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from django.utils import timezone
+
+from .storage import get_post_image_storage
 
 
 User = get_user_model()
@@ -45,6 +49,26 @@ class Location(PublishCreateModel):
         return self.name
 
 
+class PostQuerySet(models.QuerySet):
+    def with_related(self):
+        """Подтягивает всё, что выводится в карточке публикации."""
+        return self.select_related('author', 'category', 'location')
+
+    def published(self):
+        """Публикации, видимые всем: опубликованные, с наступившей датой
+        и в опубликованной категории (или без категории).
+        """
+        from .publication import visibility_cutoff
+
+        return self.filter(
+            is_published=True,
+            pub_date__lte=visibility_cutoff()
+        ).filter(
+            models.Q(category__is_published=True)
+            | models.Q(category__isnull=True)
+        )
+
+
 class Post(PublishCreateModel):
     title = models.CharField(max_length=256, verbose_name='Заголовок')
     text = models.TextField(verbose_name='Текст')
@@ -53,28 +77,84 @@ class Post(PublishCreateModel):
                               help_text='Если установить дату и время'
                                         ' в будущем — можно делать'
                                         ' отложенные публикации.'))
+    # Отдельные индексы по author и category не нужны: их покрывают
+    # составные индексы из Meta.indexes.
     author = models.ForeignKey(User, on_delete=models.CASCADE,
+                               db_index=False,
                                verbose_name='Автор публикации')
     location = models.ForeignKey(Location, on_delete=models.SET_NULL,
                                  null=True, blank=True,
                                  verbose_name='Местоположение')
     category = models.ForeignKey(Category, on_delete=models.SET_NULL,
-                                 null=True, verbose_name='Категория')
+                                 null=True, db_index=False,
+                                 verbose_name='Категория')
     image = models.ImageField(blank=True,
                               verbose_name='Фото',
-                              upload_to='posts_images')
+                              upload_to='posts_images',
+                              storage=get_post_image_storage)
+    updated_at = models.DateTimeField(auto_now=True,
+                                      verbose_name='Изменено')
+    has_image_variants = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Есть уменьшенные копии фото'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        db_index=True,
+        verbose_name='Количество комментариев'
+    )
 
-    @property
-    def comment_count(self):
-        return self.comments.count()
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        indexes = [
+            # Частичные индексы по опубликованным постам — для СУБД,
+            # которые их поддерживают (SQLite, PostgreSQL); остальные
+            # пропускают их и используют составные индексы ниже.
+            models.Index(
+                fields=['-pub_date', '-id'],
+                condition=models.Q(is_published=True),
+                name='post_feed_partial_idx'
+            ),
+            models.Index(
+                fields=['category', '-pub_date', '-id'],
+                condition=models.Q(is_published=True),
+                name='post_category_partial_idx'
+            ),
+            models.Index(
+                fields=['is_published', '-pub_date'],
+                name='post_published_date_idx'
+            ),
+            models.Index(
+                fields=['category', 'is_published', '-pub_date'],
+                name='post_category_date_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date'],
+                name='post_author_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    @cached_property
+    def image_variants(self):
+        """Адреса src и srcset уменьшенных копий фото или None."""
+        if not (self.image and self.has_image_variants):
+            return None
+        from .images import srcset, variant_urls
+        urls = variant_urls(self.image.name)
+        return {
+            'src': urls['card']['jpeg'],
+            'jpeg': srcset(urls, 'jpeg'),
+            'webp': srcset(urls, 'webp'),
+        }
+
 
 class Comment(PublishCreateModel):
     post = models.ForeignKey(
@@ -97,6 +177,63 @@ class Comment(PublishCreateModel):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ['-created_at']
+        indexes = [
+            # Курсорная пагинация комментариев на странице публикации.
+            models.Index(
+                fields=['post', 'created_at', 'id'],
+                name='comment_post_created_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'Комментарий {self.author} к {self.post}'
+
+
+class Job(models.Model):
+    """Фоновая задача, которую выполняет `manage.py runworker`."""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    ]
+
+    name = models.CharField(max_length=64, verbose_name='Задача')
+    payload = models.JSONField(default=dict, blank=True,
+                               verbose_name='Параметры')
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='jobs',
+        verbose_name='Публикация'
+    )
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES,
+                              default=QUEUED, verbose_name='Статус')
+    attempts = models.PositiveSmallIntegerField(default=0,
+                                                verbose_name='Попыток')
+    error = models.TextField(blank=True, verbose_name='Ошибка')
+    run_after = models.DateTimeField(default=timezone.now,
+                                     verbose_name='Не раньше')
+    created_at = models.DateTimeField(auto_now_add=True,
+                                      verbose_name='Добавлено')
+    started_at = models.DateTimeField(null=True, blank=True,
+                                      verbose_name='Начато')
+    finished_at = models.DateTimeField(null=True, blank=True,
+                                       verbose_name='Завершено')
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        indexes = [
+            models.Index(fields=['status', 'id'], name='job_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.get_status_display()})'
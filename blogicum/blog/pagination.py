@@ -0,0 +1,170 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import models
+
+POST_ORDERING = ('-pub_date', '-id')
+COMMENT_ORDERING = ('created_at', 'id')
+
+AFTER = 'a'
+BEFORE = 'b'
+
+
+def cursor_pagination_enabled():
+    return getattr(settings, 'BLOG_PAGINATION', 'offset') == 'cursor'
+
+
+def comments_per_page():
+    return getattr(settings, 'BLOG_COMMENTS_PER_PAGE', 50)
+
+
+class CursorPage(Sequence):
+    """Страница курсорной пагинации.
+
+    В отличие от `django.core.paginator.Page` не знает ни номера
+    страницы, ни общего числа объектов — только соседние курсоры.
+    """
+
+    is_cursor_page = True
+
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Пагинация по ключу сортировки вместо OFFSET.
+
+    Курсор хранит значения полей сортировки последнего (или первого)
+    объекта страницы, поэтому выборка любой страницы — это поиск по
+    индексу без подсчёта и пропуска предыдущих строк. Последнее поле
+    в `ordering` должно быть уникальным.
+    """
+
+    def __init__(self, object_list, per_page, ordering=POST_ORDERING):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [
+            object_list.model._meta.get_field(name.lstrip('-'))
+            for name in self.ordering
+        ]
+
+    def position(self, cursor):
+        """Направление и значения курсора; неверный курсор — начало."""
+        position = self.decode_cursor(cursor) if cursor else None
+        return position or (AFTER, None)
+
+    def get_queryset(self, cursor=None):
+        """Запрос страницы по курсору — на одну запись больше per_page."""
+        return self._page_queryset(*self.position(cursor))
+
+    def get_page(self, cursor=None):
+        """Страница по курсору; неверный курсор — первая страница."""
+        direction, values = self.position(cursor)
+        items = list(self._page_queryset(direction, values))
+        if direction == BEFORE:
+            has_previous = len(items) > self.per_page
+            items = items[:self.per_page][::-1]
+            return self._make_page(
+                items, has_next=True, has_previous=has_previous
+            )
+        has_next = len(items) > self.per_page
+        return self._make_page(
+            items[:self.per_page], has_next=has_next,
+            has_previous=values is not None
+        )
+
+    def _page_queryset(self, direction, values):
+        reverse = direction == BEFORE
+        ordering = self.ordering
+        if reverse:
+            ordering = [
+                name[1:] if name.startswith('-') else f'-{name}'
+                for name in ordering
+            ]
+        queryset = self.object_list.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, reverse=reverse))
+        return queryset[:self.per_page + 1]
+
+    def _make_page(self, items, has_next, has_previous):
+        next_cursor = previous_cursor = None
+        if items and has_next:
+            next_cursor = self.encode_cursor(AFTER, items[-1])
+        if items and has_previous:
+            previous_cursor = self.encode_cursor(BEFORE, items[0])
+        return CursorPage(items, self, next_cursor, previous_cursor)
+
+    def _seek(self, values, reverse):
+        """Условие «строго после позиции» для составного ключа."""
+        condition = models.Q()
+        equal = {}
+        for name, field, value in zip(self.ordering, self.fields, values):
+            descending = name.startswith('-')
+            lookup = 'gt' if descending == reverse else 'lt'
+            condition |= models.Q(
+                **equal, **{f'{field.name}__{lookup}': value}
+            )
+            equal[field.name] = value
+        return condition
+
+    def encode_cursor(self, direction, obj):
+        values = [field.value_to_string(obj) for field in self.fields]
+        raw = json.dumps([direction, *values]).encode()
+        return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, *raw_values = json.loads(
+                base64.urlsafe_b64decode(padded.encode())
+            )
+            if direction not in (AFTER, BEFORE):
+                return None
+            if len(raw_values) != len(self.fields):
+                return None
+            values = [
+                field.to_python(value)
+                for field, value in zip(self.fields, raw_values)
+            ]
+        except (ValueError, TypeError, binascii.Error, ValidationError):
+            return None
+        if any(value is None for value in values):
+            return None
+        return direction, values
+
+
+def paginate(queryset, request, per_page):
+    """Постраничный вывод в режиме из настройки `BLOG_PAGINATION`."""
+    if cursor_pagination_enabled():
+        paginator = CursorPaginator(queryset, per_page)
+        return paginator, paginator.get_page(request.GET.get('cursor'))
+    paginator = Paginator(queryset, per_page)
+    return paginator, paginator.get_page(request.GET.get('page'))
@@ -0,0 +1,63 @@
+"""Горизонт публикации.
+
+Видимость публикаций зависит от `timezone.now()`, но меняется только
+в моменты наступления `pub_date` отложенных постов. Поэтому вместо
+текущего времени запросы сравнивают `pub_date` с зафиксированной
+отсечкой, которая остаётся прежней до ближайшей отложенной публикации
+(горизонта). Пока горизонт не наступил, результат запросов не меняется
+и его можно кешировать.
+
+Окно (отсечка, горизонт) хранится в кеше по умолчанию, общем для всех
+процессов (см. проверку blog.W001). Сохранение и удаление публикаций
+сбрасывают окно, а `BLOG_PUBLICATION_WINDOW_MAX_AGE` ограничивает его
+жизнь на случай изменений в обход сигналов.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import Post
+
+WINDOW_KEY = 'blog:publication-window'
+
+
+def window_max_age():
+    return getattr(settings, 'BLOG_PUBLICATION_WINDOW_MAX_AGE', 60)
+
+
+def refresh_window(now=None):
+    """Фиксирует новую отсечку и находит следующий горизонт."""
+    now = now or timezone.now()
+    horizon = Post.objects.filter(
+        is_published=True,
+        pub_date__gt=now
+    ).aggregate(horizon=Min('pub_date'))['horizon']
+    window = (now, horizon)
+    cache.set(WINDOW_KEY, window, window_max_age())
+    return window
+
+
+def get_window():
+    window = cache.get(WINDOW_KEY)
+    if window is None:
+        return refresh_window()
+    cutoff, horizon = window
+    now = timezone.now()
+    if now < cutoff or (horizon is not None and now >= horizon):
+        return refresh_window(now)
+    return window
+
+
+def reset_window():
+    cache.delete(WINDOW_KEY)
+
+
+def visibility_cutoff():
+    """Момент, с которым сравнивается `pub_date` в публичных выборках."""
+    return get_window()[0]
+
+
+def next_publication_at():
+    """Ближайшая отложенная публикация или None."""
+    return get_window()[1]
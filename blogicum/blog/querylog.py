@@ -0,0 +1,226 @@
+"""Журнал медленных и повторяющихся SQL-запросов.
+
+`QueryLogMiddleware` включается настройкой `BLOG_QUERY_LOG_ENABLED`
+и через `connection.execute_wrapper` следит за запросами каждого
+HTTP-запроса:
+
+- запрос дольше `BLOG_SLOW_QUERY_MS` пишется в лог `blog.querylog`
+  с именем представления и местом в коде или шаблоне, откуда он вызван;
+- одинаковые запросы (тот же SQL с теми же параметрами) и один и тот же
+  SQL, выполненный не меньше `BLOG_QUERY_REPEAT_THRESHOLD` раз
+  с разными параметрами, — признак N+1 — отмечаются в конце запроса.
+
+Итоги по каждому HTTP-запросу дописываются строкой JSON в файл
+`BLOG_QUERY_STATS_PATH`; сводку по ним печатает `manage.py query_stats`.
+"""
+import json
+import logging
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.base import Node
+from django.utils import timezone
+
+from core import profiling
+from core.profiling import normalize_sql
+
+logger = logging.getLogger(__name__)
+
+current_log = ContextVar('current_query_log', default=None)
+
+# Обёртки запросов — не место, откуда запрос вызван.
+INSTRUMENTATION_FILES = {__file__, profiling.__file__}
+
+
+def query_log_enabled():
+    return getattr(settings, 'BLOG_QUERY_LOG_ENABLED', False)
+
+
+def slow_query_ms():
+    return getattr(settings, 'BLOG_SLOW_QUERY_MS', 100)
+
+
+def repeat_threshold():
+    return getattr(settings, 'BLOG_QUERY_REPEAT_THRESHOLD', 5)
+
+
+def stats_path():
+    path = getattr(settings, 'BLOG_QUERY_STATS_PATH', None)
+    return Path(path) if path else None
+
+
+def is_project_file(filename):
+    return (
+        filename.startswith(str(settings.BASE_DIR))
+        and 'site-packages' not in filename
+        and filename not in INSTRUMENTATION_FILES
+    )
+
+
+def query_origin():
+    """Ближайшие к запросу строка кода проекта и узел шаблона.
+
+    Обходит стек, поэтому вызывается только для медленных
+    и повторных запросов.
+    """
+    code = template = None
+    frame = sys._getframe(1)
+    while frame is not None and (code is None or template is None):
+        filename = frame.f_code.co_filename
+        if code is None and is_project_file(filename):
+            path = Path(filename).relative_to(settings.BASE_DIR)
+            code = f'{path}:{frame.f_lineno} ({frame.f_code.co_name})'
+        if template is None:
+            node = frame.f_locals.get('self')
+            token = getattr(node, 'token', None)
+            if isinstance(node, Node) and token and node.origin:
+                template = f'{node.origin.template_name}:{token.lineno}'
+        frame = frame.f_back
+    return ', '.join(filter(None, (template, code))) or None
+
+
+class QueryLog:
+    """Запросы одного HTTP-запроса."""
+
+    def __init__(self, request):
+        self.request = request
+        self.started = time.perf_counter()
+        self.count = 0
+        self.sql_time = 0.0
+        self.identical = Counter()
+        self.statements = Counter()
+        self.origins = {}
+        self.slow = []
+
+    @property
+    def view(self):
+        match = getattr(self.request, 'resolver_match', None)
+        if match is not None:
+            return match.view_name
+        return self.request.path
+
+    def record(self, sql, params, duration):
+        self.count += 1
+        self.sql_time += duration
+        statement = normalize_sql(sql)
+        self.statements[statement] += 1
+        key = (sql, repr(params))
+        self.identical[key] += 1
+        milliseconds = duration * 1000
+        repeated = (
+            self.identical[key] == 2
+            or self.statements[statement] == repeat_threshold()
+        )
+        slow = milliseconds >= slow_query_ms()
+        if not (repeated or slow):
+            return
+        origin = query_origin()
+        if repeated:
+            self.origins.setdefault(statement, origin)
+        if slow:
+            self.slow.append(
+                {'sql': statement, 'ms': round(milliseconds, 1),
+                 'origin': origin}
+            )
+            logger.warning(
+                'Медленный запрос %.1f мс в %s (%s): %s',
+                milliseconds, self.view, origin, sql
+            )
+
+    def repeated(self):
+        """Повторы: одинаковые запросы и N+1 по одному SQL."""
+        identical = defaultdict(int)
+        for (sql, params), count in self.identical.items():
+            if count > 1:
+                identical[normalize_sql(sql)] += count - 1
+        return [
+            {'sql': statement, 'count': count,
+             'identical': identical.get(statement, 0),
+             'origin': self.origins.get(statement)}
+            for statement, count in self.statements.most_common()
+            if statement in identical or count >= repeat_threshold()
+        ]
+
+    def summary(self, response):
+        return {
+            'time': timezone.now().isoformat(timespec='seconds'),
+            'view': self.view,
+            'method': self.request.method,
+            'status': response.status_code,
+            'duration_ms': round(
+                (time.perf_counter() - self.started) * 1000, 1
+            ),
+            'queries': self.count,
+            'sql_ms': round(self.sql_time * 1000, 1),
+            'slow': self.slow,
+            'repeated': self.repeated(),
+        }
+
+
+def query_wrapper(execute, sql, params, many, context):
+    log = current_log.get()
+    if log is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        log.record(sql, params, time.perf_counter() - started)
+
+
+def write_stats(summary):
+    path = stats_path()
+    if path is None:
+        return
+    line = json.dumps(summary, ensure_ascii=False) + '\n'
+    # Одна запись в режиме добавления: строки разных процессов
+    # не перемешиваются.
+    with open(path, 'a', encoding='utf-8') as stream:
+        stream.write(line)
+
+
+def read_stats(path):
+    with open(path, encoding='utf-8') as stream:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+
+class QueryLogMiddleware:
+    """Собирает журнал запросов; см. описание модуля."""
+
+    def __init__(self, get_response):
+        if not query_log_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        log = QueryLog(request)
+        token = current_log.set(log)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(query_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            current_log.reset(token)
+        summary = log.summary(response)
+        for repeated in summary['repeated']:
+            logger.warning(
+                '%s: запрос выполнен %d раз, из них повторов '
+                'с теми же параметрами — %d (%s): %s',
+                summary['view'], repeated['count'], repeated['identical'],
+                repeated['origin'], repeated['sql']
+            )
+        if log.count:
+            write_stats(summary)
+        return response
@@ -0,0 +1,240 @@
+"""Полнотекстовый поиск по публикациям.
+
+В SQLite используется виртуальная таблица FTS5 `blog_post_fts`
+с внешним содержимым (`content='blog_post'`): сами тексты не
+дублируются, а индекс поддерживается триггерами на `blog_post`.
+Таблица и триггеры создаются по сигналу `post_migrate`, а не миграцией:
+SQLite-бэкенд Django пересоздаёт `blog_post` при изменении полей,
+и триггеры при этом пропадают.
+
+Частые слова встречаются в огромном числе постов, и BM25 пришлось бы
+считать для каждого из них. Поэтому ранжируются только
+`BLOG_SEARCH_MAX_CANDIDATES` самых новых видимых совпадений: для редких
+слов это все совпадения, для частых — свежая часть ленты. Более старые
+совпадения идут за ними от новых к старым, всего не больше
+`BLOG_SEARCH_MAX_RESULTS` результатов.
+
+На других СУБД поиск сводится к `icontains` по заголовку и тексту.
+"""
+import re
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+FTS_TABLE = 'blog_post_fts'
+MAX_TERMS = 10
+
+# Маркеры подсветки, которых не бывает в пользовательском тексте;
+# заменяются на <mark> после экранирования сниппета.
+MARK_START = '\x02'
+MARK_END = '\x03'
+
+FTS_TRIGGERS = {
+    'blog_post_fts_ai': f"""
+        CREATE TRIGGER blog_post_fts_ai AFTER INSERT ON blog_post BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, title, text)
+            VALUES (new.id, new.title, new.text);
+        END
+    """,
+    'blog_post_fts_ad': f"""
+        CREATE TRIGGER blog_post_fts_ad AFTER DELETE ON blog_post BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+            VALUES ('delete', old.id, old.title, old.text);
+        END
+    """,
+    'blog_post_fts_au': f"""
+        CREATE TRIGGER blog_post_fts_au AFTER UPDATE OF title, text
+        ON blog_post BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+            VALUES ('delete', old.id, old.title, old.text);
+            INSERT INTO {FTS_TABLE}(rowid, title, text)
+            VALUES (new.id, new.title, new.text);
+        END
+    """,
+}
+
+
+def max_candidates():
+    return getattr(settings, 'BLOG_SEARCH_MAX_CANDIDATES', 500)
+
+
+def max_results():
+    return getattr(settings, 'BLOG_SEARCH_MAX_RESULTS', 10_000)
+
+
+def fts_available(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def install_search_index(using=connection):
+    """Создаёт FTS-таблицу и недостающие триггеры.
+
+    Если триггеров не было, за это время индекс мог отстать
+    от таблицы, поэтому он перестраивается целиком.
+    """
+    if not fts_available(using):
+        return
+    with using.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "title, text, content='blog_post', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            "AND tbl_name = 'blog_post'"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [
+            sql for name, sql in FTS_TRIGGERS.items() if name not in existing
+        ]
+        for sql in missing:
+            cursor.execute(sql)
+        if missing:
+            rebuild_search_index(using)
+
+
+def drop_search_triggers(using=connection):
+    """Отключает обновление индекса, например на время массовой загрузки.
+
+    Вернуть триггеры и перестроить индекс — `install_search_index`.
+    """
+    if not fts_available(using):
+        return
+    with using.cursor() as cursor:
+        for name in FTS_TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+
+
+def rebuild_search_index(using=connection):
+    with using.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
+
+
+def build_match_query(query):
+    """Превращает пользовательский ввод в безопасный запрос FTS5.
+
+    Все слова должны встретиться. Поиск по префиксу не используется:
+    FTS5 объединяет списки всех слов с этим префиксом целиком, и запрос
+    становится на порядок медленнее.
+    """
+    terms = re.findall(r'\w+', query)[:MAX_TERMS]
+    return ' '.join(f'"{term}"' for term in terms)
+
+
+class SearchResults(Sequence):
+    """Результаты поиска для Paginator.
+
+    Сначала идут `ranked_ids` — самые новые видимые совпадения в порядке
+    BM25, затем все более старые совпадения от новых к старым. Сами
+    публикации со сниппетами загружаются для запрошенного среза, то есть
+    для одной страницы.
+    """
+
+    def __init__(self, queryset, match, ranked_ids):
+        self.queryset = queryset
+        self.match = match
+        self.ids = ranked_ids
+        self.older = None
+        if len(ranked_ids) >= max_candidates():
+            self.older = matching(queryset, match).filter(
+                pk__lt=min(ranked_ids)
+            ).order_by('-pk')
+
+    @cached_property
+    def older_count(self):
+        """Число более старых совпадений по одному индексу FTS.
+
+        Проверка видимости для всех совпадений частого слова стоила бы
+        больше самого поиска, поэтому скрытые публикации здесь тоже
+        посчитаны: последняя страница может оказаться короче. Счёт
+        останавливается на `BLOG_SEARCH_MAX_RESULTS`.
+        """
+        if self.older is None:
+            return 0
+        with connections[self.queryset.db].cursor() as cursor:
+            cursor.execute(
+                f'SELECT count(*) FROM (SELECT rowid FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s AND rowid < %s LIMIT %s)',
+                [self.match, min(self.ids),
+                 max(max_results() - len(self.ids), 0)]
+            )
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return len(self.ids) + self.older_count
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop, _ = index.indices(len(self))
+        ids = self.ids[start:stop]
+        if stop > len(self.ids):
+            ids += list(self.older.values_list('pk', flat=True)[
+                max(start - len(self.ids), 0):stop - len(self.ids)
+            ])
+        posts = matching(self.queryset, self.match).filter(
+            pk__in=ids
+        ).extra(
+            select={'search_snippet': (
+                f"snippet({FTS_TABLE}, 1, '{MARK_START}', '{MARK_END}', "
+                "'…', 24)"
+            )},
+        ).in_bulk()
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+def matching(queryset, match):
+    """Публикации из `queryset`, совпавшие с запросом FTS5."""
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[
+            f'{FTS_TABLE}.rowid = blog_post.id',
+            f'{FTS_TABLE} MATCH %s',
+        ],
+        params=[match],
+    )
+
+
+def rank_visible(queryset, match):
+    """Id самых новых видимых совпадений в порядке BM25.
+
+    Видимость проверяется до LIMIT тем же `queryset`, поэтому правила
+    не дублируются в SQL, а скрытые совпадения не вытесняют видимые.
+    """
+    candidates = matching(queryset, match).extra(
+        select={'search_rank': f'bm25({FTS_TABLE}, 10.0, 1.0)'}
+    ).order_by().extra(
+        order_by=[f'-{FTS_TABLE}.rowid']
+    ).values_list('pk', 'search_rank')
+    ranked = sorted(candidates[:max_candidates()], key=lambda row: row[1])
+    return [pk for pk, rank in ranked]
+
+
+def search_posts(queryset, query):
+    """Отбирает из `queryset` публикации по запросу, лучшие — первыми.
+
+    У каждой публикации появляется атрибут `search_snippet`
+    с фрагментом текста, где найденные слова размечены маркерами.
+    """
+    match = build_match_query(query)
+    if not match:
+        return queryset.none()
+    if not fts_available(connections[queryset.db]):
+        return queryset.filter(
+            Q(title__icontains=query) | Q(text__icontains=query)
+        ).extra(select={'search_snippet': 'blog_post.text'})
+    return SearchResults(queryset, match, rank_visible(queryset, match))
+
+
+def highlight_snippet(snippet):
+    html = escape(snippet or '')
+    html = html.replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+    return mark_safe(html)
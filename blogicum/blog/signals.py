@@ -0,0 +1,105 @@
+from django.db import connections
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .cache import (
+    FEED_GROUP, bump_card_generation, category_group, post_group, purge_pages
+)
+from .jobs import enqueue
+from .models import Category, Comment, Location, Post
+from .publication import reset_window
+from .search import install_search_index
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    Post.objects.filter(
+        pk=instance.post_id,
+        comment_count__gt=0
+    ).update(comment_count=F('comment_count') - 1)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_post_cards(sender, **kwargs):
+    bump_card_generation()
+
+
+@receiver(post_init, sender=Post)
+def remember_post_category(sender, instance, **kwargs):
+    instance._loaded_category_id = instance.__dict__.get('category_id')
+
+
+@receiver(post_init, sender=Post)
+def remember_post_image(sender, instance, **kwargs):
+    image = instance.__dict__.get('image')
+    instance._loaded_image_name = getattr(image, 'name', image) or ''
+
+
+def purge_category_pages(*category_ids):
+    slugs = Category.objects.filter(
+        pk__in=[pk for pk in category_ids if pk is not None]
+    ).values_list('slug', flat=True)
+    purge_pages(*(category_group(slug) for slug in slugs))
+
+
+# Подключается раньше purge_post_pages: сброшенные страницы уже не
+# ссылаются на копии старого фото. Сами файлы не удаляются — на них могут
+# ссылаться другие публикации (см. blog.storage).
+@receiver(post_save, sender=Post)
+def queue_post_image_processing(sender, instance, created, **kwargs):
+    """Ставит в очередь проверку и обработку нового фото публикации."""
+    image_name = instance.image.name or ''
+    if created:
+        if not image_name:
+            return
+    elif image_name == instance._loaded_image_name:
+        return
+    if instance.has_image_variants:
+        Post.objects.filter(pk=instance.pk).update(has_image_variants=False)
+        instance.has_image_variants = False
+        instance.__dict__.pop('image_variants', None)
+    instance._loaded_image_name = image_name
+    if image_name:
+        enqueue('process_post_image', post=instance, image=image_name)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def purge_post_pages(sender, instance, **kwargs):
+    reset_window()
+    purge_pages(FEED_GROUP, post_group(instance.pk))
+    purge_category_pages(instance.category_id, instance._loaded_category_id)
+    instance._loaded_category_id = instance.category_id
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_comment_pages(sender, instance, created=False, **kwargs):
+    purge_pages(post_group(instance.post_id))
+    if created or kwargs['signal'] is post_delete:
+        # Число комментариев выводится в карточках ленты и категории.
+        purge_pages(FEED_GROUP)
+        if Comment.post.is_cached(instance):
+            # Представления комментариев уже загрузили публикацию.
+            category_ids = [instance.post.category_id]
+        else:
+            category_ids = Post.objects.filter(
+                pk=instance.post_id
+            ).values_list('category_id', flat=True)
+        purge_category_pages(*category_ids)
+
+
+def install_search_index_after_migrate(sender, using, **kwargs):
+    install_search_index(connections[using])
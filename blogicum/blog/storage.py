@@ -0,0 +1,57 @@
+"""Хранилище фото публикаций с адресацией по содержимому.
+
+Имя файла — SHA-256 его содержимого: posts_images/ab/abcd….jpg.
+Одинаковые файлы хранятся один раз, сколько бы публикаций на них
+ни ссылалось, а повторная загрузка той же картинки ничего не пишет.
+
+Поэтому файл нельзя удалять вместе с публикацией: на него могут
+ссылаться другие. Число ссылок — это число публикаций с таким
+`image`; файлы без ссылок удаляет команда `collect_images`.
+"""
+import hashlib
+import os
+import posixpath
+
+from django.core.files.storage import FileSystemStorage
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def content_hash(content):
+    """SHA-256 содержимого; для загрузок он уже посчитан при приёме."""
+    known = getattr(content, 'content_hash', None)
+    if known:
+        return known
+    hasher = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        hasher.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return hasher.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    def content_name(self, name, content):
+        directory, filename = posixpath.split(name)
+        extension = posixpath.splitext(filename)[1].lower()
+        digest = content_hash(content)
+        return posixpath.join(directory, digest[:2], digest + extension)
+
+    def _save(self, name, content):
+        name = self.content_name(name, content)
+        if self.exists(name):
+            # Файл снова нужен новой публикации: свежее время изменения
+            # не даёт collect_images --min-age удалить его до коммита.
+            os.utime(self.path(name))
+            return name
+        return super()._save(name, content)
+
+
+post_image_storage = ContentAddressedStorage()
+
+
+def get_post_image_storage():
+    return post_image_storage
@@ -0,0 +1,47 @@
+"""Обработчики фоновых задач блога."""
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from .cache import FEED_GROUP, post_group, purge_pages
+from .images import generate_variants, strip_metadata
+from .jobs import job
+from .models import Post
+from .signals import purge_category_pages
+
+
+def purge_post(post):
+    purge_pages(FEED_GROUP, post_group(post.pk))
+    purge_category_pages(post.category_id)
+
+
+@job('process_post_image')
+def process_post_image(task):
+    """Проверяет фото публикации, удаляет EXIF и готовит копии.
+
+    Если фото успели заменить, задача для старого файла ничего не делает.
+    С некорректным файлом публикация остаётся без фото; сам файл
+    удалит `collect_images`, если на него никто не ссылается.
+    """
+    post = task.post
+    image_name = task.payload['image']
+    if post is None or post.image.name != image_name:
+        return
+    try:
+        clean_name = strip_metadata(post.image)
+    except ValidationError:
+        Post.objects.filter(pk=post.pk, image=image_name).update(
+            image='', updated_at=timezone.now()
+        )
+        purge_post(post)
+        raise
+    post.image.name = clean_name
+    if not generate_variants(post.image):
+        raise ValidationError('Не удалось подготовить копии фото.')
+    # update() не трогает auto_now, а по updated_at меняется версия
+    # закешированной карточки (см. post_card_version).
+    Post.objects.filter(pk=post.pk, image=image_name).update(
+        image=clean_name,
+        has_image_variants=True,
+        updated_at=timezone.now()
+    )
+    purge_post(post)
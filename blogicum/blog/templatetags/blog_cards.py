@@ -0,0 +1,24 @@
+from django import template
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from blog.cache import card_generation, card_timeout, post_card_key
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post):
+    """Карточка публикации, отрендеренная один раз на версию поста."""
+    # Поколение читается из кеша один раз на страницу, а не на карточку.
+    generation = context.render_context.get('post_card_generation')
+    if generation is None:
+        generation = card_generation()
+        context.render_context['post_card_generation'] = generation
+    key = post_card_key(post, generation)
+    html = cache.get(key)
+    if html is None:
+        html = get_template('includes/post_card.html').render({'post': post})
+        cache.set(key, html, card_timeout())
+    return mark_safe(html)
@@ -0,0 +1,11 @@
+from django import template
+
+from blog.search import highlight_snippet
+
+register = template.Library()
+
+
+@register.filter
+def highlight(snippet):
+    """Экранирует сниппет и подсвечивает найденные слова тегом <mark>."""
+    return highlight_snippet(snippet)
@@ -0,0 +1,115 @@
+"""Потоковый приём загружаемых изображений.
+
+`StreamingImageUploadHandler` пишет загрузку во временный файл кусками
+по `chunk_size`, поэтому память процесса не растёт с размером файла.
+По ходу приёма он:
+
+* прерывает запись, если файл больше `BLOG_UPLOAD_MAX_SIZE`;
+* читает из первых байтов только заголовок изображения и отклоняет
+  файл, если в нём больше `BLOG_UPLOAD_MAX_PIXELS` пикселей, — до того,
+  как что-либо попытается его декодировать (защита от «бомб»);
+* считает SHA-256 содержимого для поиска одинаковых файлов.
+
+Ошибки не прерывают запрос: файл получает атрибут `upload_error`,
+а форма показывает его как ошибку поля.
+"""
+import hashlib
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+# Сколько первых байтов файла может занимать заголовок изображения
+# вместе с EXIF и прочими метаданными.
+MAX_HEADER_SIZE = 1024 * 1024
+
+
+def max_upload_size():
+    return getattr(settings, 'BLOG_UPLOAD_MAX_SIZE', 10 * 1024 * 1024)
+
+
+def max_upload_pixels():
+    return getattr(settings, 'BLOG_UPLOAD_MAX_PIXELS', 40_000_000)
+
+
+def read_image_size(header):
+    """Размер изображения по его началу, без декодирования пикселей.
+
+    None — данных пока не хватает или это не изображение.
+    """
+    try:
+        with Image.open(BytesIO(header)) as image:
+            return image.size
+    except Image.DecompressionBombError:
+        # Pillow сам счёл размер опасным; наш лимит его тоже отклонит.
+        return (max_upload_pixels() + 1, 1)
+    except (OSError, ValueError, SyntaxError):
+        return None
+
+
+class StreamingImageUploadHandler(FileUploadHandler):
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.file = TemporaryUploadedFile(
+            self.file_name, self.content_type, 0,
+            self.charset, self.content_type_extra
+        )
+        self.file.upload_error = None
+        self.file.image_size = None
+        self.hasher = hashlib.sha256()
+        self.header = b''
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.file.upload_error:
+            return None
+        self.received += len(raw_data)
+        if self.received > max_upload_size():
+            return self.reject(
+                f'Файл больше {filesizeformat(max_upload_size())}.'
+            )
+        if self.file.image_size is None and len(self.header) < MAX_HEADER_SIZE:
+            self.header += raw_data
+            self.file.image_size = read_image_size(self.header)
+            if self.file.image_size is not None:
+                self.header = b''
+                width, height = self.file.image_size
+                if width * height > max_upload_pixels():
+                    return self.reject(
+                        'Изображение слишком большое: '
+                        f'не более {max_upload_pixels()} пикселей.'
+                    )
+        self.hasher.update(raw_data)
+        self.file.write(raw_data)
+        return None
+
+    def reject(self, message):
+        """Отбрасывает уже записанное; остаток загрузки пропускается."""
+        self.file.upload_error = message
+        self.file.truncate(0)
+        self.file.seek(0)
+        self.header = b''
+        return None
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        if self.file.upload_error:
+            self.file.size = 0
+            return self.file
+        self.file.size = file_size
+        self.file.content_hash = self.hasher.hexdigest()
+        return self.file
+
+    def upload_interrupted(self):
+        if hasattr(self, 'file'):
+            temp_location = self.file.temporary_file_path()
+            try:
+                self.file.close()
+                os.remove(temp_location)
+            except FileNotFoundError:
+                pass
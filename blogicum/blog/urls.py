@@ -3,7 +3,7 @@ from .views import (
     UserUpdateView, UserDetailView, PostListView,
     PostCreateView, PostUpdateView, PostDeleteView,
     PostDetailView, CategoryPostsView, CommentCreateView,
-    CommentUpdateView, CommentDeleteView
+    CommentUpdateView, CommentDeleteView, PostSearchView, PostCommentsView
 )
 
 
@@ -11,8 +11,11 @@ app_name = "blog"
 
 urlpatterns = [
     path("", PostListView.as_view(), name="index"),
+    path("search/", PostSearchView.as_view(), name="search"),
     path("posts/create/", PostCreateView.as_view(), name="create_post"),
     path("posts/<int:pk>/", PostDetailView.as_view(), name="post_detail"),
+    path("posts/<int:pk>/comments/", PostCommentsView.as_view(),
+         name="post_comments"),
     path("posts/<int:pk>/edit/", PostUpdateView.as_view(), name="edit_post"),
     path("posts/<int:pk>/delete/", PostDeleteView.as_view(), name="delete_post"),
     path("category/<slug:category_slug>/", CategoryPostsView.as_view(),
@@ -1,3 +1,8 @@
+from http import HTTPStatus
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.http import HttpResponse
 from django.views.generic import (
     ListView, DetailView, CreateView, UpdateView, DeleteView
 )
@@ -6,13 +11,97 @@ from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
 from django.contrib.auth.models import User
 from django.utils import timezone
+from django.db import transaction
+from core.db.replicas import (
+    pinned_to_primary, reads_from_replica, replica_reads
+)
 from .models import Post, Category, Comment
 from .forms import UserEditForm, PostForm, CommentForm, CommentUpdateForm
-from django.core.paginator import Paginator
-from django.db import models
+from .pagination import (
+    COMMENT_ORDERING, CursorPaginator, comments_per_page,
+    cursor_pagination_enabled, paginate
+)
+from .search import search_posts
+from .cache import (
+    FEED_GROUP, category_group, page_cache_key, page_timeout, post_group,
+    recently_purged
+)
+
+
+class PostPaginationMixin:
+    """Подключает курсорную пагинацию к ListView, если она включена."""
+
+    def paginate_queryset(self, queryset, page_size):
+        if not cursor_pagination_enabled():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size)
+        page = paginator.get_page(self.request.GET.get('cursor'))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class ReplicaReadMixin:
+    """Читает страницу с реплики, если пользователь ничего не менял.
+
+    Ответ отрисовывается здесь же: ленивые QuerySet выполняются
+    при отрисовке шаблона, и они тоже должны идти на реплику.
+    """
 
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or pinned_to_primary(request):
+            return super().dispatch(request, *args, **kwargs)
+        with replica_reads():
+            response = super().dispatch(request, *args, **kwargs)
+            if not getattr(response, 'is_rendered', True):
+                response.render()
+        return response
 
-class UserDetailView(DetailView):
+
+class AnonymousPageCacheMixin:
+    """Кеширует страницу целиком для анонимных GET-запросов.
+
+    Страница попадает в группы из `get_page_cache_groups`; сигналы
+    сбрасывают группу при изменении публикаций, комментариев и категорий.
+    Страница, прочитанная с реплики вскоре после сброса её группы,
+    не кешируется: реплика могла ещё не получить изменение.
+    """
+
+    page_cache_groups = (FEED_GROUP,)
+
+    def get_page_cache_groups(self):
+        return self.page_cache_groups
+
+    def is_page_cacheable(self):
+        return True
+
+    def dispatch(self, request, *args, **kwargs):
+        if (request.method != 'GET' or request.user.is_authenticated
+                or not self.is_page_cacheable()):
+            return super().dispatch(request, *args, **kwargs)
+
+        groups = self.get_page_cache_groups()
+        key = page_cache_key(request.get_full_path(), groups)
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        from_replica = reads_from_replica()
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == HTTPStatus.OK:
+            def store(response):
+                if from_replica and recently_purged(groups):
+                    return
+                timeout = page_timeout()
+                if timeout and not request.META.get('CSRF_COOKIE_USED'):
+                    cache.set(
+                        key, (response.content, response['Content-Type']),
+                        timeout
+                    )
+            response.add_post_render_callback(store)
+        return response
+
+
+class UserDetailView(ReplicaReadMixin, DetailView):
     model = User
     template_name = 'blog/profile.html'
     context_object_name = 'profile'
@@ -22,22 +111,12 @@ class UserDetailView(DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        if self.request.user == self.object:
-            user_posts = Post.objects.filter(author=self.object)
-        else:
-            user_posts = Post.objects.filter(
-                author=self.object,
-                is_published=True,
-                pub_date__lte=timezone.now()
-            ).filter(
-                models.Q(category__is_published=True) |
-                models.Q(category__isnull=True)
-            )
+        user_posts = Post.objects.with_related().filter(author=self.object)
+        if self.request.user != self.object:
+            user_posts = user_posts.published()
 
         user_posts = user_posts.order_by('-pub_date')
-        paginator = Paginator(user_posts, 10)
-        page_number = self.request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
+        paginator, page_obj = paginate(user_posts, self.request, 10)
 
         context['page_obj'] = page_obj
         context['paginator'] = paginator
@@ -58,22 +137,33 @@ class UserUpdateView(LoginRequiredMixin, UpdateView):
                                     self.request.user.username})
 
 
-class PostListView(ListView):
+class PostListView(ReplicaReadMixin, AnonymousPageCacheMixin,
+                   PostPaginationMixin, ListView):
     model = Post
     ordering = '-pub_date'
     paginate_by = 10
     template_name = 'blog/index.html'
 
     def get_queryset(self):
-        queryset = Post.objects.filter(
-            is_published=True,
-            pub_date__lte=timezone.now(), 
-        ).filter(
-            models.Q(category__is_published=True) |
-            models.Q(category__isnull=True)
+        return Post.objects.published().with_related().order_by('-pub_date')
+
+
+class PostSearchView(ListView):
+    paginate_by = 10
+    template_name = 'blog/search.html'
+    context_object_name = 'posts'
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        return search_posts(
+            Post.objects.published().with_related(), self.query
         )
 
-        return queryset.order_by('-pub_date')
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        context['page_params'] = urlencode({'q': self.query}) + '&'
+        return context
 
 
 class PostCreateView(LoginRequiredMixin, CreateView):
@@ -102,6 +192,13 @@ class PostUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
     def get_success_url(self):
         return reverse_lazy('blog:post_detail', kwargs={'pk': self.object.pk})
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['image_job'] = self.object.jobs.filter(
+            name='process_post_image'
+        ).order_by('-id').first()
+        return context
+
     def handle_no_permission(self):
         """Обрабатываем случаи, когда пользователь не авторизован
         или не автор/админ
@@ -132,10 +229,14 @@ class PostDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
         return context
 
 
-class PostDetailView(DetailView):
+class PostDetailView(ReplicaReadMixin, AnonymousPageCacheMixin, DetailView):
     model = Post
+    queryset = Post.objects.with_related()
     template_name = 'blog/detail.html'
 
+    def get_page_cache_groups(self):
+        return (post_group(self.kwargs['pk']),)
+
     def get_object(self, queryset=None):
         post = super().get_object(queryset)
 
@@ -163,18 +264,41 @@ class PostDetailView(DetailView):
         context = super().get_context_data(**kwargs)
         context['is_future_post'] = self.object.pub_date > timezone.now()
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.select_related(
-            'author'
-        ).order_by('created_at')
-
+        context['comments_page'] = self.get_comments_page()
         return context
 
+    def is_page_cacheable(self):
+        # Каждый курсор комментариев занял бы в кеше отдельную запись.
+        return 'cursor' not in self.request.GET
+
+    def get_comments_paginator(self):
+        return CursorPaginator(
+            self.object.comments.select_related('author'),
+            comments_per_page(), ordering=COMMENT_ORDERING
+        )
+
+    def get_comments_page(self):
+        """Страница комментариев по курсору из `?cursor=`."""
+        return self.get_comments_paginator().get_page(
+            self.request.GET.get('cursor')
+        )
+
+
+class PostCommentsView(PostDetailView):
+    """Следующая страница комментариев — фрагмент HTML для подгрузки."""
 
-class CategoryPostsView(ListView):
+    template_name = 'includes/comment_page.html'
+
+
+class CategoryPostsView(ReplicaReadMixin, AnonymousPageCacheMixin,
+                        PostPaginationMixin, ListView):
     model = Category
     paginate_by = 10
     template_name = 'blog/category.html'
 
+    def get_page_cache_groups(self):
+        return (category_group(self.kwargs['category_slug']),)
+
     def get_queryset(self):
         self.category = get_object_or_404(
             Category,
@@ -182,12 +306,8 @@ class CategoryPostsView(ListView):
             is_published=True
         )
 
-        queryset = Post.objects.select_related(
-            'author', 'location', 'category'
-        ).filter(
-            category=self.category,
-            is_published=True,
-            pub_date__lte=timezone.now()
+        queryset = Post.objects.published().with_related().filter(
+            category=self.category
         )
 
         return queryset.order_by('-pub_date')
@@ -198,16 +318,27 @@ class CategoryPostsView(ListView):
         return context
 
 
-class CommentCreateView(LoginRequiredMixin, CreateView):
-    model = Comment
-    form_class = CommentForm
-    template_name = 'blog/comment.html'
+class CommentPostMixin:
+    """Публикация и комментарий загружаются один раз за запрос.
 
-    def form_valid(self, form):
-        post = get_object_or_404(Post, pk=self.kwargs['post_pk'])
-        form.instance.post = post
-        form.instance.author = self.request.user
-        return super().form_valid(form)
+    `test_func`, `get`/`post` и `get_context_data` обращаются к ним
+    по нескольку раз, поэтому результат запоминается в представлении.
+    """
+
+    def get_post(self):
+        if not hasattr(self, '_post'):
+            self._post = get_object_or_404(Post, pk=self.kwargs['post_pk'])
+        return self._post
+
+    def get_object(self, queryset=None):
+        if not hasattr(self, '_comment'):
+            self._comment = get_object_or_404(
+                Comment.objects.select_related('post', 'author'),
+                pk=self.kwargs['comment_pk'],
+                post__pk=self.kwargs['post_pk']
+            )
+            self._post = self._comment.post
+        return self._comment
 
     def get_success_url(self):
         return reverse_lazy('blog:post_detail',
@@ -215,58 +346,45 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['post'] = get_object_or_404(Post, pk=self.kwargs['post_pk'])
+        context['post'] = self.get_post()
         return context
 
 
-class CommentUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
-    model = Comment
-    form_class = CommentUpdateForm
-    template_name = 'blog/comment.html'
-
-    def get_object(self):
-        return get_object_or_404(
-            Comment,
-            pk=self.kwargs['comment_pk'],
-            post__pk=self.kwargs['post_pk']
-        )
+class CommentAuthorMixin(CommentPostMixin, UserPassesTestMixin):
+    """Изменять комментарий может только его автор."""
 
     def test_func(self):
-        comment = self.get_object()
-        return self.request.user == comment.author
+        return self.request.user == self.get_object().author
 
-    def get_success_url(self):
-        return reverse_lazy('blog:post_detail',
-                            kwargs={'pk': self.kwargs['post_pk']})
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['post'] = get_object_or_404(Post, pk=self.kwargs['post_pk'])
-        return context
+class CommentCreateView(LoginRequiredMixin, CommentPostMixin, CreateView):
+    model = Comment
+    form_class = CommentForm
+    template_name = 'blog/comment.html'
+
+    def form_valid(self, form):
+        form.instance.post = self.get_post()
+        form.instance.author = self.request.user
+        with transaction.atomic():
+            return super().form_valid(form)
 
 
-class CommentDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class CommentUpdateView(LoginRequiredMixin, CommentAuthorMixin, UpdateView):
     model = Comment
+    form_class = CommentUpdateForm
     template_name = 'blog/comment.html'
 
-    def get_object(self):
-        return get_object_or_404(
-            Comment,
-            pk=self.kwargs['comment_pk'],
-            post__pk=self.kwargs['post_pk']
-        )
 
-    def test_func(self):
-        comment = self.get_object()
-        return self.request.user == comment.author
+class CommentDeleteView(LoginRequiredMixin, CommentAuthorMixin, DeleteView):
+    model = Comment
+    template_name = 'blog/comment.html'
 
-    def get_success_url(self):
-        return reverse_lazy('blog:post_detail',
-                            kwargs={'pk': self.kwargs['post_pk']})
+    def delete(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(request, *args, **kwargs)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['post'] = get_object_or_404(Post, pk=self.kwargs['post_pk'])
         if 'form' in context:
             del context['form']
         context['is_delete_page'] = True
@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_asgi_application()
+
+# Под ASGI запросы могут выполняться в разных потоках, поэтому
+# соединения возвращаются в пул процесса, а не живут в потоке.
+from core.db.pool import enable_pool  # noqa: E402
+
+enable_pool()
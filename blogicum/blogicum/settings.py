@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -36,6 +37,7 @@ ALLOWED_HOSTS = [
 INSTALLED_APPS = [
     'blog',
     'pages',
+    'core',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -46,11 +48,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.profiling.ProfilingMiddleware',
+    'blog.querylog.QueryLogMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.db.replicas.PrimaryPinMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -81,13 +86,56 @@ WSGI_APPLICATION = 'blogicum.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# core.db.backends.sqlite3 — встроенный бэкенд SQLite плюс PRAGMA при
+# соединении (по умолчанию WAL, synchronous=NORMAL, mmap, busy_timeout;
+# переопределяются в OPTIONS['pragmas']) и BEGIN IMMEDIATE вместо BEGIN,
+# чтобы конкурирующие записи ждали блокировку, а не падали.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение живёт между запросами и проверяется перед
+        # использованием; под ASGI его хранит пул процесса (pool_size).
+        'CONN_MAX_AGE': 600,
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'health_checks': True,
+            'pool_size': 8,
+        },
     }
 }
 
+# Реплики только для чтения — алиасы из DATABASES. На них уходят
+# чтения моделей из DATABASE_REPLICA_APPS на страницах ленты, категорий,
+# профиля и публикации; после отправки формы пользователь ещё
+# DATABASE_PRIMARY_PIN_SECONDS секунд читает с основной базы, а страницы,
+# прочитанные с реплики, столько же не кешируются. Значение должно быть
+# больше отставания реплик.
+# Локальная реплика — копия db.sqlite3, обновляемая
+# `manage.py sync_replicas --interval 5`:
+#
+# DATABASES['replica'] = {
+#     'ENGINE': 'core.db.backends.sqlite3',
+#     'NAME': BASE_DIR / 'db-replica.sqlite3',
+#     'CONN_MAX_AGE': 600,
+#     'OPTIONS': {
+#         'pragmas': {'journal_mode': None, 'query_only': 'on'},
+#         # sync_replicas подменяет файл: постоянное соединение со старым
+#         # файлом не проходит проверку и открывается заново.
+#         'health_checks': True,
+#         'pool_size': 8,
+#     },
+#     'TEST': {'MIRROR': 'default'},
+# }
+# DATABASE_REPLICAS = ['replica']
+DATABASE_REPLICAS = []
+
+DATABASE_REPLICA_APPS = ('blog', 'auth')
+
+DATABASE_PRIMARY_PIN_SECONDS = 15
+
+DATABASE_ROUTERS = ['core.db.replicas.ReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -142,6 +190,97 @@ LOGIN_REDIRECT_URL = 'blog:index'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+MEDIA_URL = '/media/'
+
+# Кто отдаёт тело медиафайлов: None — само приложение; 'x-sendfile' —
+# Apache/lighttpd по заголовку X-Sendfile; 'x-accel-redirect' — nginx
+# по внутреннему адресу MEDIA_ACCEL_REDIRECT_PREFIX + путь к файлу.
+MEDIA_SENDFILE = None
+
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# Режим постраничного вывода публикаций: 'offset' — по номеру страницы,
+# 'cursor' — по курсору (pub_date, id) без COUNT(*) и OFFSET.
+BLOG_PAGINATION = 'offset'
+
+# Сколько комментариев показывать на странице публикации за раз;
+# следующие подгружаются по курсору (created_at, id).
+BLOG_COMMENTS_PER_PAGE = 50
+
+# Страницы, карточки и горизонт публикации кешируются в кеше по
+# умолчанию, а сигналы сбрасывают их там же, поэтому кеш должен быть общим
+# для всех процессов веб-сервера и команд (runworker, publish_scheduled).
+# Файловый кеш годится для одного сервера; для нескольких — Memcached
+# или Redis. Процессный LocMemCache отклоняет проверка blog.W001.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': Path(tempfile.gettempdir()) / 'blogicum-cache',
+        'OPTIONS': {
+            # Версии групп страниц не должны вытесняться вместе
+            # со страницами.
+            'MAX_ENTRIES': 20000,
+        },
+    }
+}
+
+# Сколько секунд хранить отрендеренные карточки публикаций.
+BLOG_CARD_CACHE_TIMEOUT = 60 * 60
+
+# Сколько секунд можно считать видимость публикаций неизменной, если
+# отложенных постов нет или их добавили в обход сигналов.
+BLOG_PUBLICATION_WINDOW_MAX_AGE = 60
+
+# Сколько самых новых совпадений ранжировать при полнотекстовом поиске.
+BLOG_SEARCH_MAX_CANDIDATES = 500
+
+# Сколько результатов поиска можно пролистать: дальше нужно уточнить
+# запрос. Ограничивает подсчёт совпадений для частых слов.
+BLOG_SEARCH_MAX_RESULTS = 10_000
+
+# Фоновые задачи выполняет `manage.py runworker`. True — выполнять их
+# сразу после коммита, в процессе веб-сервера (для разработки).
+BLOG_JOBS_EAGER = False
+
+BLOG_JOBS_MAX_ATTEMPTS = 3
+
+# Пауза перед повтором после временной ошибки, с; растёт с каждой
+# попыткой.
+BLOG_JOBS_RETRY_DELAY = 30
+
+# Загрузки пишутся на диск кусками; размер и число пикселей
+# проверяются до декодирования изображения.
+FILE_UPLOAD_HANDLERS = [
+    'blog.uploadhandlers.StreamingImageUploadHandler',
+]
+
+BLOG_UPLOAD_MAX_SIZE = 10 * 1024 * 1024
+
+BLOG_UPLOAD_MAX_PIXELS = 40_000_000
+
+# Профилирование запросов (core.profiling): время SQL, шаблонов и кеша
+# в заголовке Server-Timing и в логе core.profiling. Доля запросов
+# PROFILING_SAMPLE_RATE выполняется под cProfile с дампом
+# в PROFILING_DUMP_DIR.
+PROFILING_ENABLED = False
+
+PROFILING_SERVER_TIMING = True
+
+PROFILING_SAMPLE_RATE = 0.0
+
+PROFILING_DUMP_DIR = BASE_DIR / 'profiles'
+
+# Журнал медленных и повторяющихся запросов (blog.querylog); сводку
+# по BLOG_QUERY_STATS_PATH печатает `manage.py query_stats`.
+BLOG_QUERY_LOG_ENABLED = False
+
+BLOG_SLOW_QUERY_MS = 100
+
+# С какого числа выполнений одного SQL за запрос считать его N+1.
+BLOG_QUERY_REPEAT_THRESHOLD = 5
+
+BLOG_QUERY_STATS_PATH = BASE_DIR / 'query_stats.ndjson'
@@ -14,17 +14,24 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.contrib.auth.forms import UserCreationForm
 from django.views.generic import CreateView
 
+from core.views import connection_metrics, serve_media
+
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include, reverse_lazy
+from django.urls import path, include, re_path, reverse_lazy
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path(
+        'internal/db-connections/', connection_metrics,
+        name='connection_metrics'
+    ),
     path('', include('blog.urls')),
     path('pages/', include('pages.urls')),
     path('auth/', include('django.contrib.auth.urls')),
@@ -41,4 +48,10 @@ urlpatterns = [
 
 handler404 = 'core.views.page_not_found'
 handler500 = 'core.views.server_error'
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+urlpatterns += [
+    re_path(
+        r'^{}(?P<path>.*)$'.format(re.escape(settings.MEDIA_URL.lstrip('/'))),
+        serve_media,
+        name='media'
+    ),
+]
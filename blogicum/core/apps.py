@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from .db.metrics import track_request
+
+        request_started.connect(
+            track_request, dispatch_uid='core.db.metrics.track_request'
+        )
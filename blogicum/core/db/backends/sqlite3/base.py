@@ -0,0 +1,189 @@
+"""SQLite с настройками для работы под нагрузкой.
+
+Подключается как `ENGINE = 'core.db.backends.sqlite3'` и отличается
+от встроенного бэкенда тем, что при каждом соединении выполняет PRAGMA
+из `OPTIONS['pragmas']` (поверх `DEFAULT_PRAGMAS`) и SQL из
+`OPTIONS['init_commands']`, а транзакции открывает в режиме
+`OPTIONS['transaction_mode']`.
+
+WAL позволяет читать во время записи, а `BEGIN IMMEDIATE` берёт
+блокировку записи в начале транзакции: иначе транзакция, начавшая
+с чтения, при попытке записи сразу получает «database is locked»,
+не дожидаясь `busy_timeout`.
+
+С `OPTIONS['health_checks']` постоянное соединение (CONN_MAX_AGE)
+перед запросом и после него проверяется: `SELECT 1` и тот же ли это
+файл — `sync_replicas` подменяет файл реплики, и старое соединение
+читало бы прежнюю копию. `OPTIONS['pool_size']` — размер пула
+процесса, который включает `core.db.pool.enable_pool()`.
+"""
+import os
+import re
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+from core.db import metrics, pool
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'wal',
+    # В режиме WAL NORMAL не теряет целостность, но не ждёт fsync
+    # на каждом коммите.
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение — размер в КиБ, а не в страницах.
+    'cache_size': -20000,
+    'temp_store': 'memory',
+}
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+IDENTIFIER = re.compile(r'^[A-Za-z_]+$')
+
+
+def pragma_sql(name, value):
+    if not IDENTIFIER.match(name):
+        raise ImproperlyConfigured(f'Недопустимое имя PRAGMA: {name!r}')
+    if not isinstance(value, int) and not IDENTIFIER.match(str(value)):
+        raise ImproperlyConfigured(
+            f'Недопустимое значение PRAGMA {name}: {value!r}'
+        )
+    return f'PRAGMA {name} = {value}'
+
+
+def expired(close_at):
+    return close_at is not None and time.monotonic() >= close_at
+
+
+OWN_OPTIONS = (
+    'pragmas', 'init_commands', 'transaction_mode', 'health_checks',
+    'pool_size',
+)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    health_checks = False
+    pool_size = 0
+    # (st_dev, st_ino) файла базы на момент открытия соединения.
+    file_identity = None
+    # Соединение закрывается как негодное или устаревшее — не в пул.
+    discarding = False
+
+    def get_connection_params(self):
+        options = self.settings_dict['OPTIONS']
+        self.pragmas = {**DEFAULT_PRAGMAS, **options.get('pragmas', {})}
+        self.init_commands = list(options.get('init_commands', ()))
+        self.transaction_mode = options.get('transaction_mode')
+        self.health_checks = options.get('health_checks', False)
+        self.pool_size = options.get('pool_size', 0)
+        if (self.transaction_mode is not None
+                and self.transaction_mode.upper() not in TRANSACTION_MODES):
+            raise ImproperlyConfigured(
+                f'transaction_mode должен быть одним из {TRANSACTION_MODES}'
+            )
+        kwargs = super().get_connection_params()
+        for name in OWN_OPTIONS:
+            kwargs.pop(name, None)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        connection_pool = self.get_pool()
+        if connection_pool is not None:
+            connection, identity, close_at = connection_pool.acquire()
+            while connection is not None:
+                if expired(close_at):
+                    metrics.record(self.alias, 'expired')
+                elif self.is_healthy(connection, identity):
+                    metrics.record(self.alias, 'from_pool')
+                    self.file_identity = identity
+                    # connect() уже назначил новый срок; возвращаем срок
+                    # самого соединения.
+                    self.close_at = close_at
+                    return connection
+                else:
+                    metrics.record(self.alias, 'unhealthy')
+                connection.close()
+                connection, identity, close_at = connection_pool.acquire()
+
+        started = time.perf_counter()
+        connection = super().get_new_connection(conn_params)
+        self.file_identity = self.current_file_identity()
+        for name, value in self.pragmas.items():
+            if value is not None:
+                connection.execute(pragma_sql(name, value))
+        for sql in self.init_commands:
+            connection.execute(sql)
+        metrics.record_connect(self.alias, time.perf_counter() - started)
+        return connection
+
+    def get_pool(self):
+        if (not self.pool_size or not pool.pooling_enabled()
+                or self.is_in_memory_db()):
+            return None
+        return pool.get_pool(
+            self.alias, str(self.settings_dict['NAME']), self.pool_size
+        )
+
+    def current_file_identity(self):
+        if self.is_in_memory_db():
+            return None
+        try:
+            stat = os.stat(self.settings_dict['NAME'])
+        except (OSError, TypeError, ValueError):
+            return None
+        return stat.st_dev, stat.st_ino
+
+    def is_healthy(self, connection, identity):
+        if identity is not None and identity != self.current_file_identity():
+            return False
+        try:
+            connection.execute('SELECT 1').fetchone()
+        except base.Database.Error:
+            return False
+        return True
+
+    def is_usable(self):
+        return self.is_healthy(self.connection, self.file_identity)
+
+    def close_if_unusable_or_obsolete(self):
+        self.discarding = True
+        try:
+            if (self.connection is not None and self.health_checks
+                    and not self.is_usable()):
+                metrics.record(self.alias, 'unhealthy')
+                self.close()
+                return
+            super().close_if_unusable_or_obsolete()
+        finally:
+            self.discarding = False
+
+    def can_return_to_pool(self):
+        return (
+            self.connection is not None
+            and not self.discarding
+            and not self.errors_occurred
+            and self.autocommit == self.settings_dict['AUTOCOMMIT']
+            and not expired(self.close_at)
+            and self.is_usable()
+        )
+
+    def _close(self):
+        connection_pool = self.get_pool()
+        if connection_pool is not None and self.can_return_to_pool():
+            if self.connection.in_transaction:
+                self.connection.rollback()
+            if connection_pool.release(
+                    self.connection, self.file_identity, self.close_at):
+                metrics.record(self.alias, 'returned')
+                return
+        if self.connection is not None:
+            metrics.record(self.alias, 'closed')
+        super()._close()
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode:
+            self.cursor().execute(f'BEGIN {self.transaction_mode.upper()}')
+        else:
+            super()._start_transaction_under_autocommit()
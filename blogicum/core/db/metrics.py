@@ -0,0 +1,59 @@
+"""Счётчики соединений с базой в текущем процессе.
+
+По ним видно, сколько запросов обошлись без установки соединения:
+`reused` — запрос начался с уже открытым соединением, `from_pool` —
+соединение взято из пула, `opened` — пришлось открыть новое.
+"""
+import threading
+from collections import Counter, defaultdict
+
+from django.db import connections
+
+from core.profiling import current_profile
+
+_lock = threading.Lock()
+_counters = defaultdict(Counter)
+_connect_seconds = defaultdict(float)
+
+
+def record(alias, event):
+    with _lock:
+        _counters[alias][event] += 1
+
+
+def record_connect(alias, seconds):
+    with _lock:
+        _counters[alias]['opened'] += 1
+        _connect_seconds[alias] += seconds
+    profile = current_profile.get()
+    if profile is not None:
+        profile.connect_time += seconds
+
+
+def track_request(**kwargs):
+    """Получатель request_started: было ли соединение уже открыто."""
+    for connection in connections.all():
+        record(connection.alias, 'requests')
+        if connection.connection is not None:
+            record(connection.alias, 'reused')
+
+
+def snapshot():
+    with _lock:
+        result = {}
+        for alias, counter in _counters.items():
+            opened = counter['opened']
+            seconds = _connect_seconds[alias]
+            result[alias] = {
+                **counter,
+                'connect_ms_total': round(seconds * 1000, 1),
+                'connect_ms_avg': round(seconds * 1000 / opened, 3)
+                if opened else None,
+            }
+        return result
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _connect_seconds.clear()
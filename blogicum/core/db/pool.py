@@ -0,0 +1,91 @@
+"""Пул соединений SQLite на процесс.
+
+Под ASGI синхронный код запроса может выполняться в новом потоке,
+а соединения Django привязаны к потоку: с окончанием потока его
+соединение пропадает, и CONN_MAX_AGE не помогает. Когда пул включён
+(`enable_pool()` в blogicum/asgi.py), соединение в конце каждого
+запроса возвращается в пул процесса, а следующий запрос в любом
+потоке берёт его оттуда, если оно прошло проверку.
+
+В пул не возвращаются соединения, которые Django закрывает как
+негодные или устаревшие, а срок CONN_MAX_AGE (`close_at`) хранится
+вместе с соединением и не продлевается при повторной выдаче.
+"""
+import threading
+
+from django.core.signals import request_finished
+from django.db import connections
+
+_enabled = False
+_pools = {}
+_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """Свободные соединения одной базы.
+
+    Элемент пула — (соединение, идентификатор файла, close_at).
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.idle = []
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            if self.idle:
+                return self.idle.pop()
+        return None, None, None
+
+    def release(self, connection, identity, close_at):
+        with self.lock:
+            if len(self.idle) >= self.size:
+                return False
+            self.idle.append((connection, identity, close_at))
+            return True
+
+    def close_all(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection, *_ in idle:
+            connection.close()
+
+
+def pooling_enabled():
+    return _enabled
+
+
+def get_pool(alias, name, size):
+    with _lock:
+        key = (alias, name)
+        if key not in _pools:
+            _pools[key] = ConnectionPool(size)
+        return _pools[key]
+
+
+def release_connections(**kwargs):
+    """Возвращает в пул соединения, открытые за время запроса."""
+    for connection in connections.all():
+        if connection.connection is None or connection.in_atomic_block:
+            continue
+        connection.close()
+
+
+def enable_pool():
+    global _enabled
+    _enabled = True
+    request_finished.connect(
+        release_connections, dispatch_uid='core.db.pool.release'
+    )
+
+
+def disable_pool():
+    global _enabled
+    _enabled = False
+    request_finished.disconnect(dispatch_uid='core.db.pool.release')
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
@@ -0,0 +1,113 @@
+"""Чтение с реплик.
+
+Реплики — алиасы из `DATABASES`, перечисленные в `DATABASE_REPLICAS`.
+`ReplicaRouter` отправляет на них чтение только внутри
+`replica_reads()`, которым представления помечают страницы, где
+небольшое отставание данных допустимо; остальное идёт в `default`.
+
+Чтобы после отправки формы пользователь сразу видел свою публикацию
+или комментарий, `PrimaryPinMiddleware` после каждого успешного
+изменяющего запроса ставит cookie, и ещё `DATABASE_PRIMARY_PIN_SECONDS`
+секунд его запросы читают с основной базы.
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = 'primary_pin'
+
+reading_from_replica = ContextVar('reading_from_replica', default=False)
+
+
+def replica_aliases():
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+def replica_apps():
+    return set(getattr(settings, 'DATABASE_REPLICA_APPS', ('blog', 'auth')))
+
+
+def pin_seconds():
+    return getattr(settings, 'DATABASE_PRIMARY_PIN_SECONDS', 15)
+
+
+def reads_from_replica():
+    """Чтения сейчас уходят на реплику (см. ReplicaRouter)."""
+    return bool(replica_aliases()) and reading_from_replica.get()
+
+
+@contextmanager
+def replica_reads():
+    token = reading_from_replica.set(True)
+    try:
+        yield
+    finally:
+        reading_from_replica.reset(token)
+
+
+def pinned_to_primary(request):
+    """Пользователь недавно что-то изменил и должен видеть свежие данные."""
+    try:
+        until = float(request.COOKIES.get(PIN_COOKIE, 0))
+    except ValueError:
+        return False
+    return until > time.time()
+
+
+def pin_to_primary(response):
+    seconds = pin_seconds()
+    if seconds:
+        response.set_cookie(
+            PIN_COOKIE, f'{time.time() + seconds:.0f}', max_age=seconds,
+            httponly=True, samesite='Lax'
+        )
+
+
+class ReplicaRouter:
+    """Чтение внутри replica_reads() — со случайной реплики."""
+
+    def choose_replica(self, replicas):
+        return random.choice(replicas)
+
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if (not replicas or not reading_from_replica.get()
+                or model._meta.app_label not in replica_apps()):
+            return None
+        # В транзакции читаем то, что в ней же записали.
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return self.choose_replica(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Реплики получают схему вместе с данными от основной базы.
+        if db in replica_aliases():
+            return False
+        return None
+
+
+class PrimaryPinMiddleware:
+    """Закрепляет за основной базой того, кто только что изменил данные."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (replica_aliases() and request.method not in ('GET', 'HEAD')
+                and response.status_code < 400):
+            pin_to_primary(response)
+        return response
@@ -0,0 +1,72 @@
+import os
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.db.replicas import replica_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в реплики из DATABASE_REPLICAS '
+        'через backup API: локальная замена репликации.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Повторять копирование каждые столько секунд; '
+                 '0 — скопировать один раз.'
+        )
+
+    def handle(self, *args, **options):
+        targets = self.replica_paths()
+        while True:
+            for alias, path in targets:
+                started = time.perf_counter()
+                self.copy(path)
+                self.stdout.write(
+                    f'{alias}: {path} за '
+                    f'{(time.perf_counter() - started) * 1000:.0f} мс'
+                )
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def replica_paths(self):
+        targets = []
+        for alias in replica_aliases():
+            database = settings.DATABASES.get(alias)
+            if database is None:
+                raise CommandError(f'В DATABASES нет реплики {alias!r}.')
+            if 'sqlite3' not in database['ENGINE']:
+                raise CommandError(
+                    f'{alias}: копировать можно только SQLite, '
+                    'для других СУБД нужна их собственная репликация.'
+                )
+            targets.append((alias, str(database['NAME'])))
+        if not targets:
+            raise CommandError('DATABASE_REPLICAS пуст.')
+        return targets
+
+    def copy(self, path):
+        """Копирует базу во временный файл и подменяет им реплику.
+
+        Читатели реплики не ждут копирования: открытые соединения
+        дочитывают старый файл, новые открывают уже новый.
+        """
+        source = connections[DEFAULT_DB_ALIAS]
+        source.ensure_connection()
+        partial = f'{path}.partial'
+        target = sqlite3.connect(partial)
+        try:
+            source.connection.backup(target)
+            # Заголовок скопирован вместе с режимом WAL основной базы;
+            # реплике, которую подменяют целиком, нужен обычный журнал.
+            target.execute('PRAGMA journal_mode = DELETE')
+        finally:
+            target.close()
+        os.replace(partial, path)
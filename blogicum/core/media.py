@@ -0,0 +1,133 @@
+"""Отдача файлов из MEDIA_ROOT.
+
+Заменяет `django.views.static.serve`: поддерживает условные запросы
+(ETag, Last-Modified), запросы диапазонов (Range, If-Range) и долгое
+кеширование файлов, чьё имя — хеш содержимого. В режиме
+`MEDIA_SENDFILE` тело ответа отдаёт фронтовой сервер (nginx, Apache,
+lighttpd), а приложение только проверяет запрос и ставит заголовки.
+"""
+import mimetypes
+import posixpath
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+# Имена вида <sha256>.jpg и <sha256>-card.webp (см. blog.storage):
+# содержимое по такому адресу никогда не меняется.
+HASHED_NAME = re.compile(r'(?:^|/)[0-9a-f]{64}(?:-[\w-]+)?\.\w+$')
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, no-cache'
+
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def sendfile_mode():
+    """None, 'x-sendfile' или 'x-accel-redirect'."""
+    return getattr(settings, 'MEDIA_SENDFILE', None)
+
+
+def accel_redirect_prefix():
+    return getattr(
+        settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/'
+    )
+
+
+def resolve(path):
+    """Путь к файлу внутри MEDIA_ROOT или Http404."""
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        full_path = Path(safe_join(settings.MEDIA_ROOT, path))
+    except SuspiciousFileOperation:
+        raise Http404
+    if not full_path.is_file():
+        raise Http404
+    return path, full_path
+
+
+def file_etag(path, stat):
+    """Для имени-хеша ETag — сам хеш, иначе — время изменения и размер."""
+    if HASHED_NAME.search(path):
+        return quote_etag(posixpath.basename(path))
+    return quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+
+
+def cache_control(path):
+    if HASHED_NAME.search(path):
+        return IMMUTABLE_CACHE_CONTROL
+    return REVALIDATE_CACHE_CONTROL
+
+
+def content_type(path):
+    guessed, _ = mimetypes.guess_type(path)
+    return guessed or 'application/octet-stream'
+
+
+def parse_range(header, size):
+    """(start, end) включительно, None — отдать файл целиком.
+
+    Поддерживается один диапазон; несколько диапазонов в одном запросе
+    отдаются как обычный ответ 200. ValueError — диапазон за концом файла.
+    """
+    match = RANGE_HEADER.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start > end or start >= size:
+            raise ValueError(header)
+    else:
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError(header)
+        start, end = max(size - length, 0), size - 1
+    return start, end
+
+
+def if_range_matches(request, etag, last_modified):
+    """Range учитывается, только если If-Range совпал с текущей версией."""
+    condition = request.META.get('HTTP_IF_RANGE')
+    if not condition:
+        return True
+    if condition.startswith(('"', 'W/')):
+        return condition == etag
+    return parse_http_date_safe(condition) == last_modified
+
+
+def read_range(full_path, start, end):
+    with open(full_path, 'rb') as file:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = file.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def sendfile_headers(path, full_path):
+    mode = sendfile_mode()
+    if mode == 'x-sendfile':
+        return {'X-Sendfile': str(full_path)}
+    if mode == 'x-accel-redirect':
+        return {'X-Accel-Redirect': accel_redirect_prefix() + path}
+    return None
+
+
+def validator_headers(path, etag, last_modified):
+    return {
+        'ETag': etag,
+        'Last-Modified': http_date(last_modified),
+        'Cache-Control': cache_control(path),
+        'Accept-Ranges': 'bytes',
+    }
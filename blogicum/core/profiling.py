@@ -0,0 +1,268 @@
+"""Профилирование запросов.
+
+`ProfilingMiddleware` включается настройкой `PROFILING_ENABLED` и для
+каждого запроса собирает:
+
+- общее время обработки;
+- число и время SQL-запросов, сгруппированных по тексту запроса
+  без параметров;
+- время отрисовки шаблонов (вместе с SQL, который выполнили ленивые
+  QuerySet во время отрисовки);
+- попадания и промахи кеша;
+- время открытия соединений с базой (см. core.db.metrics).
+
+Итог отдаётся в заголовке `Server-Timing` (его видно в инструментах
+разработчика браузера) и пишется в лог `core.profiling`. Доля запросов
+`PROFILING_SAMPLE_RATE` выполняется под cProfile, а дампы сохраняются
+в `PROFILING_DUMP_DIR` для анализа через pstats или snakeviz.
+"""
+import cProfile
+import logging
+import random
+import re
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.backends.django import Template
+from django.utils.module_loading import import_string
+from django.utils.text import slugify
+
+logger = logging.getLogger(__name__)
+
+current_profile = ContextVar('current_profile', default=None)
+
+# Списки параметров разной длины — один и тот же запрос.
+PARAMETER_LIST = re.compile(r'%s(?:\s*,\s*%s)+')
+NUMBER = re.compile(r'\b\d+\b')
+WHITESPACE = re.compile(r'\s+')
+
+# Сколько самых долгих запросов выводить в лог.
+TOP_STATEMENTS = 5
+
+
+def profiling_enabled():
+    return getattr(settings, 'PROFILING_ENABLED', False)
+
+
+def sample_rate():
+    return getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+
+
+def dump_dir():
+    return Path(getattr(
+        settings, 'PROFILING_DUMP_DIR', settings.BASE_DIR / 'profiles'
+    ))
+
+
+def server_timing_enabled():
+    return getattr(settings, 'PROFILING_SERVER_TIMING', True)
+
+
+def normalize_sql(sql):
+    """Текст запроса без чисел и с одним `%s` вместо списка параметров."""
+    sql = PARAMETER_LIST.sub('%s, ...', sql)
+    sql = NUMBER.sub('?', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+class RequestProfile:
+    """Счётчики одного запроса."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.statements = defaultdict(lambda: [0, 0.0])
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_time = 0.0
+        self.in_cache_call = False
+        self.connect_time = 0.0
+
+    def record_sql(self, sql, duration):
+        statement = self.statements[normalize_sql(sql)]
+        statement[0] += 1
+        statement[1] += duration
+        self.sql_count += 1
+        self.sql_time += duration
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+
+    def top_statements(self, limit=TOP_STATEMENTS):
+        return sorted(
+            self.statements.items(), key=lambda item: item[1][1],
+            reverse=True
+        )[:limit]
+
+    def server_timing(self):
+        # Значения заголовков — ASCII, поэтому описания по-английски.
+        def metric(name, seconds, description):
+            return f'{name};dur={seconds * 1000:.1f};desc="{description}"'
+
+        return ', '.join((
+            metric('total', self.total, 'Total'),
+            metric('sql', self.sql_time, f'{self.sql_count} queries'),
+            metric('template', self.template_time, 'Templates'),
+            metric(
+                'cache', self.cache_time,
+                f'{self.cache_hits} hits, {self.cache_misses} misses'
+            ),
+            metric('connect', self.connect_time, 'DB connect'),
+        ))
+
+
+def sql_wrapper(execute, sql, params, many, context):
+    profile = current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.record_sql(sql, time.perf_counter() - started)
+
+
+def profile_render(render):
+    """Учитывает время только внешних шаблонов: вложенные уже внутри."""
+    @wraps(render)
+    def wrapper(self, *args, **kwargs):
+        profile = current_profile.get()
+        if profile is None:
+            return render(self, *args, **kwargs)
+        profile.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            profile.template_depth -= 1
+            if not profile.template_depth:
+                profile.template_time += time.perf_counter() - started
+    wrapper.profiled = True
+    return wrapper
+
+
+def count_get(result, key, default=None, version=None):
+    return (0, 1) if result is default else (1, 0)
+
+
+def count_get_many(result, keys, version=None):
+    return len(result), len(keys) - len(result)
+
+
+def profile_cache(method, count):
+    """Считает попадания и промахи; `count` разбирает результат."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        profile = current_profile.get()
+        # get_many базового класса вызывает get для каждого ключа.
+        if profile is None or profile.in_cache_call:
+            return method(self, *args, **kwargs)
+        profile.in_cache_call = True
+        started = time.perf_counter()
+        try:
+            result = method(self, *args, **kwargs)
+        finally:
+            profile.in_cache_call = False
+            profile.cache_time += time.perf_counter() - started
+        hits, misses = count(result, *args, **kwargs)
+        profile.cache_hits += hits
+        profile.cache_misses += misses
+        return result
+    wrapper.profiled = True
+    return wrapper
+
+
+def instrument():
+    """Оборачивает отрисовку шаблонов и чтение из кеша.
+
+    Обёртки ничего не делают вне профилируемого запроса, поэтому
+    ставятся один раз на процесс.
+    """
+    if not getattr(Template.render, 'profiled', False):
+        Template.render = profile_render(Template.render)
+    for options in settings.CACHES.values():
+        backend = import_string(options['BACKEND'])
+        if not getattr(backend.get, 'profiled', False):
+            backend.get = profile_cache(backend.get, count_get)
+        if not getattr(backend.get_many, 'profiled', False):
+            backend.get_many = profile_cache(backend.get_many, count_get_many)
+
+
+class ProfilingMiddleware:
+    """Собирает профиль запроса; см. описание модуля."""
+
+    def __init__(self, get_response):
+        if not profiling_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        instrument()
+
+    def __call__(self, request):
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(sql_wrapper)
+                    )
+                if random.random() < sample_rate():
+                    response = self.run_sampled(request)
+                else:
+                    response = self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        profile.finish()
+        if server_timing_enabled():
+            response['Server-Timing'] = profile.server_timing()
+        self.log(request, response, profile)
+        return response
+
+    def run_sampled(self, request):
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Уже работает другой профилировщик.
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        elapsed = (time.perf_counter() - started) * 1000
+        directory = dump_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        name = slugify(request.path.replace('/', '-')) or 'root'
+        path = directory / (
+            f'{time.strftime("%Y%m%d-%H%M%S")}-{request.method}-'
+            f'{name[:60]}-{elapsed:.0f}ms.prof'
+        )
+        profiler.dump_stats(path)
+        logger.info('Профиль %s сохранён в %s', request.path, path)
+        return response
+
+    def log(self, request, response, profile):
+        logger.info(
+            '%s %s %s: %.1f мс, SQL %d за %.1f мс, шаблоны %.1f мс, '
+            'кеш %d/%d',
+            request.method, request.path, response.status_code,
+            profile.total * 1000, profile.sql_count,
+            profile.sql_time * 1000, profile.template_time * 1000,
+            profile.cache_hits, profile.cache_hits + profile.cache_misses,
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            for sql, (count, duration) in profile.top_statements():
+                logger.debug('  %d × %.1f мс: %s', count,
+                             duration * 1000, sql)
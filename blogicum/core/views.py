@@ -1,13 +1,87 @@
+from http import HTTPStatus
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import (
+    FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
+)
 from django.shortcuts import render
+from django.utils.cache import get_conditional_response
+from django.views.decorators.http import require_safe
+
+from . import media
+from .db import metrics
 
 
-def page_not_found(request):
+def page_not_found(request, exception):
     return render(request, 'pages/404.html', status=404)
 
 
-def csrf_failure(request):
+def csrf_failure(request, reason=''):
     return render(request, 'pages/403csrf.html', status=403)
 
 
 def server_error(request):
     return render(request, 'pages/500.html', status=500)
+
+
+@staff_member_required
+def connection_metrics(request):
+    """Счётчики соединений с базой в обслужившем запрос процессе."""
+    return JsonResponse(metrics.snapshot())
+
+
+@require_safe
+def serve_media(request, path):
+    """Отдаёт файл из MEDIA_ROOT с проверкой версий и диапазонами."""
+    path, full_path = media.resolve(path)
+    stat = full_path.stat()
+    etag = media.file_etag(path, stat)
+    last_modified = int(stat.st_mtime)
+    headers = media.validator_headers(path, etag, last_modified)
+
+    base = HttpResponse(headers=headers)
+    conditional = get_conditional_response(
+        request, etag=etag, last_modified=last_modified, response=base
+    )
+    if conditional is not base:
+        return conditional
+
+    sendfile = media.sendfile_headers(path, full_path)
+    if sendfile:
+        # Диапазоны и тело ответа обрабатывает фронтовой сервер.
+        return HttpResponse(
+            content_type=media.content_type(path),
+            headers={**headers, **sendfile}
+        )
+
+    size = stat.st_size
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if range_header and media.if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = media.parse_range(range_header, size)
+        except ValueError:
+            return HttpResponse(
+                status=HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={**headers, 'Content-Range': f'bytes */{size}'}
+            )
+
+    if byte_range is None:
+        response = FileResponse(
+            open(full_path, 'rb'), content_type=media.content_type(path)
+        )
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    start, end = byte_range
+    return StreamingHttpResponse(
+        media.read_range(full_path, start, end),
+        status=HTTPStatus.PARTIAL_CONTENT,
+        content_type=media.content_type(path),
+        headers={
+            **headers,
+            'Content-Range': f'bytes {start}-{end}/{size}',
+            'Content-Length': str(end - start + 1),
+        }
+    )
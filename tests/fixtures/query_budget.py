@@ -0,0 +1,56 @@
+from contextlib import contextmanager
+from typing import Optional
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudget:
+    """Проверяет, что код внутри блока укладывается в бюджет SQL-запросов.
+
+    Значения по умолчанию берутся из маркера
+    `@pytest.mark.query_budget(queries=..., time_ms=...)`
+    и могут быть переопределены при вызове.
+    """
+
+    def __init__(
+            self, queries: Optional[int] = None,
+            time_ms: Optional[float] = None):
+        self.queries = queries
+        self.time_ms = time_ms
+
+    @contextmanager
+    def __call__(
+            self, label: str = '', queries: Optional[int] = None,
+            time_ms: Optional[float] = None):
+        queries = self.queries if queries is None else queries
+        time_ms = self.time_ms if time_ms is None else time_ms
+        with CaptureQueriesContext(connection) as context:
+            yield context
+
+        executed = context.captured_queries
+        spent_ms = sum(float(query['time']) for query in executed) * 1000
+        listing = '\n'.join(
+            f'{number}. {query["sql"]}'
+            for number, query in enumerate(executed, start=1)
+        )
+        if queries is not None and len(executed) > queries:
+            raise AssertionError(
+                f'Убедитесь, что `{label}` выполняет не больше {queries} '
+                f'SQL-запросов; выполнено {len(executed)}:\n{listing}'
+            )
+        if time_ms is not None and spent_ms > time_ms:
+            raise AssertionError(
+                f'Убедитесь, что SQL-запросы `{label}` выполняются не дольше'
+                f' {time_ms} мс; потрачено {spent_ms:.1f} мс:\n{listing}'
+            )
+
+
+@pytest.fixture
+def query_budget(request) -> QueryBudget:
+    # Маркеры модуля и теста дополняют друг друга; ближайший важнее.
+    kwargs = {}
+    for marker in reversed(list(request.node.iter_markers('query_budget'))):
+        kwargs.update(marker.kwargs)
+    return QueryBudget(**kwargs)
@@ -0,0 +1,61 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Post
+
+
+def refresh_count(post) -> int:
+    return Post.objects.values_list(
+        'comment_count', flat=True).get(pk=post.pk)
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_views(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    assert refresh_count(post) == 0
+
+    response = user_client.post(
+        f'/posts/{post.id}/comment/', data={'text': 'Первый комментарий'})
+    assert response.status_code == HTTPStatus.FOUND
+    assert refresh_count(post) == 1, (
+        'Убедитесь, что при создании комментария счётчик комментариев'
+        ' публикации увеличивается.'
+    )
+
+    comment = post.comments.get()
+    response = user_client.post(
+        f'/posts/{post.id}/delete_comment/{comment.id}/')
+    assert response.status_code == HTTPStatus.FOUND
+    assert refresh_count(post) == 0, (
+        'Убедитесь, что при удалении комментария счётчик комментариев'
+        ' публикации уменьшается.'
+    )
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_queryset_delete(mixer, comment_to_a_post):
+    post = comment_to_a_post.post
+    mixer.blend('blog.Comment', post=post)
+    assert refresh_count(post) == 2
+
+    post.comments.all().delete()
+    assert refresh_count(post) == 0, (
+        'Убедитесь, что счётчик комментариев уменьшается и при удалении'
+        ' комментариев через админ-зону.'
+    )
+
+
+@pytest.mark.django_db
+def test_rebuild_comment_counts(comment_to_a_post):
+    post = comment_to_a_post.post
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+
+    call_command('rebuild_comment_counts', stdout=StringIO())
+    assert refresh_count(post) == 1, (
+        'Убедитесь, что команда `rebuild_comment_counts` пересчитывает'
+        ' счётчик комментариев по фактическому числу комментариев.'
+    )
@@ -0,0 +1,120 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from blog.views import PostDetailView
+
+PER_PAGE = 3
+
+
+@pytest.fixture
+def comments(mixer, post_with_published_location, user):
+    created = mixer.cycle(PER_PAGE * 2 - 1).blend(
+        'blog.Comment', post=post_with_published_location, author=user
+    )
+    return sorted(created, key=lambda comment: (comment.created_at, comment.id))
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_COMMENTS_PER_PAGE=PER_PAGE)
+def test_detail_shows_first_comment_page(
+        client, post_with_published_location, comments):
+    url = f'/posts/{post_with_published_location.id}/'
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    page = response.context['comments_page']
+    assert list(page) == comments[:PER_PAGE], (
+        'Убедитесь, что на странице публикации выводится только первая '
+        'страница комментариев в порядке их создания.'
+    )
+    assert page.has_next()
+    assert f'?cursor={page.next_cursor}' in response.content.decode(), (
+        'Убедитесь, что на странице публикации есть ссылка на следующую '
+        'страницу комментариев.'
+    )
+
+    response = client.get(f'{url}?cursor={page.next_cursor}')
+    second_page = response.context['comments_page']
+    assert list(second_page) == comments[PER_PAGE:]
+    assert f'?cursor={second_page.previous_cursor}' in (
+        response.content.decode()
+    ), (
+        'Убедитесь, что со следующей страницы комментариев есть ссылка '
+        'на предыдущую.'
+    )
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_COMMENTS_PER_PAGE=PER_PAGE)
+def test_comment_cursor_pages_not_cached(
+        client, post_with_published_location, comments):
+    url = f'/posts/{post_with_published_location.id}/'
+    page = client.get(url).context['comments_page']
+    client.get(f'{url}?cursor={page.next_cursor}')
+    with CaptureQueriesContext(connection) as context:
+        client.get(f'{url}?cursor={page.next_cursor}')
+    assert context.captured_queries, (
+        'Убедитесь, что страницы комментариев по курсору не кешируются '
+        'целиком: каждый курсор занял бы отдельную запись в кеше.'
+    )
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_COMMENTS_PER_PAGE=PER_PAGE)
+def test_comment_fragment_returns_next_page(
+        client, post_with_published_location, comments):
+    post_id = post_with_published_location.id
+    first_page = client.get(f'/posts/{post_id}/').context['comments_page']
+    response = client.get(
+        f'/posts/{post_id}/comments/?cursor={first_page.next_cursor}'
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert list(response.context['comments_page']) == comments[PER_PAGE:]
+    content = response.content.decode()
+    assert '<html' not in content, (
+        'Убедитесь, что адрес `/posts/<post_id>/comments/` возвращает '
+        'фрагмент HTML без обрамляющего шаблона.'
+    )
+    assert all(
+        f'comment_{comment.id}"' in content for comment in comments[PER_PAGE:]
+    )
+    assert not response.context['comments_page'].has_next()
+
+
+@pytest.mark.django_db
+def test_comment_fragment_of_unpublished_post_not_found(
+        client, post_with_published_location):
+    post_with_published_location.is_published = False
+    post_with_published_location.save()
+    response = client.get(
+        f'/posts/{post_with_published_location.id}/comments/'
+    )
+    assert response.status_code == HTTPStatus.NOT_FOUND, (
+        'Убедитесь, что комментарии к снятой с публикации записи '
+        'недоступны другим пользователям.'
+    )
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite',
+    reason='Формат EXPLAIN проверяется только для SQLite.'
+)
+@pytest.mark.django_db
+@override_settings(BLOG_COMMENTS_PER_PAGE=PER_PAGE)
+def test_comment_page_query_uses_index(
+        rf, post_with_published_location, comments):
+    post = post_with_published_location
+    view = PostDetailView()
+    view.setup(rf.get(f'/posts/{post.id}/'), pk=post.id)
+    view.object = post
+    paginator = view.get_comments_paginator()
+    cursor = paginator.get_page().next_cursor
+    plan = paginator.get_queryset(cursor).explain()
+    assert 'comment_post_created_idx' in plan, plan
+    assert 'TEMP B-TREE FOR ORDER BY' not in plan, (
+        'Убедитесь, что страница комментариев по курсору выбирается '
+        f'по индексу `comment_post_created_idx`:\n{plan}'
+    )
@@ -0,0 +1,107 @@
+import os
+import sqlite3
+
+import pytest
+from django.db import connections
+
+from core.db import metrics, pool
+from core.db.backends.sqlite3.base import DatabaseWrapper
+
+
+@pytest.fixture
+def file_database(tmp_path):
+    """Соединение с файловой базой: тестовая база живёт в памяти."""
+    path = tmp_path / 'file.sqlite3'
+    settings_dict = {
+        **connections['default'].settings_dict,
+        'NAME': str(path),
+        'OPTIONS': {'health_checks': True, 'pool_size': 2},
+    }
+    metrics.reset()
+    wrapper = DatabaseWrapper(settings_dict, alias='file')
+    yield wrapper
+    wrapper.close()
+    pool.disable_pool()
+
+
+def replace_file(path):
+    other = f'{path}.new'
+    sqlite3.connect(other).close()
+    os.replace(other, path)
+
+
+@pytest.mark.django_db
+def test_replaced_file_fails_health_check(file_database):
+    file_database.ensure_connection()
+    assert file_database.is_usable()
+    replace_file(file_database.settings_dict['NAME'])
+    assert not file_database.is_usable(), (
+        'Убедитесь, что соединение с подменённым файлом базы '
+        'не проходит проверку.'
+    )
+    file_database.close_if_unusable_or_obsolete()
+    assert file_database.connection is None, (
+        'Убедитесь, что непрошедшее проверку соединение закрывается.'
+    )
+    assert metrics.snapshot()['file']['unhealthy'] == 1
+
+
+@pytest.mark.django_db
+def test_pool_reuses_connections(file_database):
+    pool.enable_pool()
+    file_database.ensure_connection()
+    raw = file_database.connection
+    file_database.close()
+    file_database.ensure_connection()
+    assert file_database.connection is raw, (
+        'Убедитесь, что закрытое соединение возвращается в пул '
+        'и берётся из него снова.'
+    )
+    stats = metrics.snapshot()['file']
+    assert stats['opened'] == 1 and stats['from_pool'] == 1
+
+
+@pytest.mark.django_db
+def test_pool_keeps_connection_deadline(file_database):
+    pool.enable_pool()
+    file_database.ensure_connection()
+    raw, close_at = file_database.connection, file_database.close_at
+    file_database.close()
+    file_database.ensure_connection()
+    assert file_database.close_at == close_at, (
+        'Убедитесь, что соединение из пула сохраняет срок CONN_MAX_AGE.'
+    )
+
+    file_database.close_at = 0
+    file_database.close_if_unusable_or_obsolete()
+    file_database.ensure_connection()
+    assert file_database.connection is not raw, (
+        'Убедитесь, что устаревшее по CONN_MAX_AGE соединение '
+        'не возвращается в пул.'
+    )
+
+
+@pytest.mark.django_db
+def test_pool_drops_connection_after_errors(file_database):
+    pool.enable_pool()
+    file_database.ensure_connection()
+    raw = file_database.connection
+    file_database.errors_occurred = True
+    file_database.close()
+    file_database.ensure_connection()
+    assert file_database.connection is not raw, (
+        'Убедитесь, что соединение, на котором были ошибки, '
+        'не возвращается в пул.'
+    )
+
+
+@pytest.mark.django_db
+def test_connection_metrics_view(client, admin_client):
+    assert client.get('/internal/db-connections/').status_code == 302, (
+        'Метрики соединений должны быть доступны только персоналу.'
+    )
+    response = admin_client.get('/internal/db-connections/')
+    assert response.status_code == 200
+    assert response.json()['default']['requests'] >= 1, (
+        'Убедитесь, что подсчитываются запросы к соединению.'
+    )
@@ -0,0 +1,56 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+
+from conftest import N_PER_PAGE
+
+
+def get_page(client, url):
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return response.context['page_obj']
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_PAGINATION='cursor')
+@pytest.mark.parametrize('url', ['/', '/profile/{username}/'])
+def test_cursor_pagination_walks_feed(
+        user, user_client, many_posts_with_published_locations, url):
+    url = url.format(username=user.username)
+    expected = sorted(
+        many_posts_with_published_locations,
+        key=lambda post: (post.pub_date, post.id),
+        reverse=True,
+    )
+
+    first_page = get_page(user_client, url)
+    assert not first_page.has_previous()
+    assert first_page.has_next()
+    assert list(first_page) == expected[:N_PER_PAGE]
+
+    second_page = get_page(
+        user_client, f'{url}?cursor={first_page.next_cursor}')
+    assert list(second_page) == expected[N_PER_PAGE:N_PER_PAGE * 2], (
+        'Убедитесь, что курсорная пагинация возвращает следующие'
+        ' публикации без пропусков и повторов.'
+    )
+    assert not second_page.has_next()
+    assert second_page.has_previous()
+
+    back_page = get_page(
+        user_client, f'{url}?cursor={second_page.previous_cursor}')
+    assert list(back_page) == expected[:N_PER_PAGE], (
+        'Убедитесь, что ссылка на предыдущую страницу при курсорной'
+        ' пагинации возвращает предыдущие публикации.'
+    )
+    assert not back_page.has_previous()
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_PAGINATION='cursor')
+def test_cursor_pagination_ignores_broken_cursor(
+        user_client, many_posts_with_published_locations):
+    page = get_page(user_client, '/?cursor=not-a-cursor')
+    assert len(page) == N_PER_PAGE
+    assert not page.has_previous()
@@ -0,0 +1,58 @@
+import gzip
+from datetime import datetime
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.dump import iter_objects
+
+
+def blend_post(mixer, author, category, day):
+    return mixer.blend(
+        'blog.Post', author=author, category=category, location=None,
+        pub_date=timezone.make_aware(datetime(2023, 1, day, 12)), image=''
+    )
+
+
+@pytest.fixture
+def posts(mixer, user, another_user, published_category, another_category):
+    wanted = blend_post(mixer, user, published_category, 10)
+    blend_post(mixer, another_user, published_category, 10)
+    blend_post(mixer, user, another_category, 10)
+    blend_post(mixer, user, published_category, 20)
+    mixer.blend('blog.Comment', post=wanted, author=another_user)
+    mixer.blend('blog.Comment', post=wanted, author=user)
+    return wanted
+
+
+@pytest.mark.django_db
+def test_export_blog_filters(tmp_path, posts, user, published_category):
+    path = tmp_path / 'dump.ndjson.gz'
+    call_command(
+        'export_blog', str(path),
+        '--category', published_category.slug,
+        '--author', user.username,
+        '--since', '2023-01-01', '--until', '2023-01-15',
+        '--chunk-size', '1',
+        stderr=StringIO()
+    )
+    with gzip.open(path, 'rt', encoding='utf-8') as stream:
+        objects = list(iter_objects(stream))
+
+    by_model = {}
+    for obj in objects:
+        by_model.setdefault(obj['model'], []).append(obj)
+    assert [obj['pk'] for obj in by_model['blog.post']] == [posts.pk], (
+        'Убедитесь, что export_blog учитывает фильтры по категории, '
+        'автору и датам.'
+    )
+    assert len(by_model['blog.comment']) == 2, (
+        'Убедитесь, что выгружаются комментарии отобранных публикаций.'
+    )
+    assert len(by_model['auth.user']) == 2
+    assert [obj['pk'] for obj in by_model['blog.category']] == [
+        published_category.pk
+    ]
+    assert by_model['blog.post'][0]['fields']['author'] == user.pk
@@ -0,0 +1,60 @@
+from collections import Counter
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import F
+from django.utils import timezone
+
+from blog.models import Category, Comment, Post
+
+
+def generate(**options):
+    call_command(
+        'generate_blog_data', users=20, posts=400, comments=1000,
+        categories=10, locations=5, seed=1, batch_size=150,
+        stdout=StringIO(), **options
+    )
+
+
+@pytest.mark.django_db
+def test_generate_blog_data_creates_skewed_data():
+    generate()
+    assert Post.objects.count() == 400, (
+        'Убедитесь, что создаётся заданное число публикаций.'
+    )
+    assert Comment.objects.count() == 1000, (
+        'Убедитесь, что создаётся заданное число комментариев.'
+    )
+    authors = Counter(Post.objects.values_list('author', flat=True))
+    top, *_ = authors.most_common(1)
+    assert top[1] > 3 * 400 / 20, (
+        'Убедитесь, что у популярных авторов заметно больше публикаций.'
+    )
+    assert Post.objects.filter(pub_date__gt=timezone.now()).exists(), (
+        'Убедитесь, что генерируются отложенные публикации.'
+    )
+    assert Category.objects.filter(is_published=False).exists(), (
+        'Убедитесь, что генерируются снятые с публикации категории.'
+    )
+    assert not Comment.objects.filter(
+        created_at__lt=F('post__pub_date')
+    ).exists(), 'Комментарий не может быть старше публикации.'
+    assert not Comment.objects.filter(
+        post__pub_date__gt=timezone.now()
+    ).exists(), 'Отложенные публикации не должны иметь комментариев.'
+    hottest = Post.objects.order_by('-comment_count').first()
+    assert hottest.comment_count == hottest.comments.count() > 1000 / 50, (
+        'Убедитесь, что счётчики комментариев пересчитаны, а у «горячих» '
+        'публикаций комментариев намного больше среднего.'
+    )
+
+
+@pytest.mark.django_db
+def test_generate_blog_data_can_run_twice():
+    generate()
+    generate(defer_indexes=True)
+    assert Post.objects.count() == 800, (
+        'Убедитесь, что повторный запуск дополняет данные, '
+        'а не конфликтует с уже созданными.'
+    )
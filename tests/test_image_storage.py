@@ -0,0 +1,91 @@
+import os
+import time
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from PIL import Image
+
+from blog.images import variant_names
+from blog.jobs import run_pending
+from blog.models import Post
+from blog.storage import post_image_storage
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def png(color):
+    buffer = BytesIO()
+    Image.new('RGB', (64, 48), color=color).save(buffer, format='PNG')
+    return ContentFile(buffer.getvalue(), name='photo.png')
+
+
+def blend_post(mixer, user, image):
+    return mixer.blend(
+        'blog.Post', author=user, category=None, location=None, image=image
+    )
+
+
+def collect():
+    call_command('collect_images', '--min-age', '0', stdout=StringIO())
+
+
+@pytest.mark.django_db
+def test_same_image_is_stored_once(mixer, user, another_user):
+    first = blend_post(mixer, user, png('red'))
+    second = blend_post(mixer, another_user, png('red'))
+    assert first.image.name == second.image.name, (
+        'Убедитесь, что одинаковые фото сохраняются в один файл.'
+    )
+    assert blend_post(mixer, user, png('blue')).image.name != (
+        first.image.name
+    )
+    _, files = default_storage.listdir(
+        first.image.name.rsplit('/', 1)[0]
+    )
+    assert len(files) == 1
+
+
+@pytest.mark.django_db
+def test_orphans_are_collected(mixer, user, another_user):
+    first = blend_post(mixer, user, png('red'))
+    second = blend_post(mixer, another_user, png('red'))
+    run_pending()
+    name = Post.objects.get(pk=first.pk).image.name
+    files = [name, *variant_names(name)]
+
+    first.delete()
+    collect()
+    assert all(default_storage.exists(file) for file in files), (
+        'Убедитесь, что файл не удаляется, пока на него ссылается '
+        'другая публикация.'
+    )
+
+    second.delete()
+    collect()
+    assert not any(default_storage.exists(file) for file in files), (
+        'Убедитесь, что collect_images удаляет фото без ссылок '
+        'вместе с копиями.'
+    )
+
+
+@pytest.mark.django_db
+def test_reused_image_is_not_collected_as_old(mixer, user, another_user):
+    name = blend_post(mixer, user, png('red')).image.name
+    path = default_storage.path(name)
+    day_ago = time.time() - 24 * 60 * 60
+    os.utime(path, (day_ago, day_ago))
+    Post.objects.all().delete()
+
+    # Публикацию с тем же фото сохраняют, пока идёт сборка мусора.
+    post_image_storage.save('posts_images/photo.png', png('red'))
+    call_command('collect_images', stdout=StringIO())
+    assert default_storage.exists(name), (
+        'Убедитесь, что повторно использованный файл получает свежее '
+        'время изменения и не удаляется collect_images --min-age.'
+    )
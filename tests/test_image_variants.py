@@ -0,0 +1,136 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from PIL import Image
+
+from blog.images import VARIANT_WIDTHS, variant_name, variant_names
+from blog.jobs import run_pending
+from blog.models import Job, Post
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def make_image(name, size=(2000, 1000), mode='RGB'):
+    buffer = BytesIO()
+    Image.new(mode, size, color='teal').save(buffer, format='PNG')
+    return ImageFile(buffer, name=name)
+
+
+@pytest.fixture
+def post_with_big_image(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', is_published=True, author=user,
+        category=published_category, location=None,
+        image=make_image('big.png', mode='RGBA'),
+    )
+
+
+@pytest.fixture
+def processed_post(post_with_big_image):
+    run_pending()
+    return post_with_big_image
+
+
+@pytest.mark.django_db
+def test_variants_are_generated(client, processed_post):
+    post = Post.objects.get(pk=processed_post.pk)
+    assert post.has_image_variants, (
+        'Убедитесь, что после загрузки фото у публикации появляются '
+        'уменьшенные копии.'
+    )
+    for variant, width in VARIANT_WIDTHS.items():
+        for fmt in ('jpeg', 'webp'):
+            name = variant_name(post.image.name, variant, fmt)
+            with default_storage.open(name) as file, Image.open(file) as image:
+                assert image.format == fmt.upper()
+                assert image.width == width, (
+                    'Убедитесь, что копия фото уменьшается до ширины варианта.'
+                )
+
+    content = client.get('/').content.decode('utf-8')
+    assert 'image/webp' in content and 'srcset=' in content, (
+        'Убедитесь, что карточка публикации выводит копии фото через srcset.'
+    )
+    assert f'src="{post.image.url}"' not in content, (
+        'Убедитесь, что в ленте не загружается оригинал фото.'
+    )
+    assert f'href="{post.image.url}"' in content, (
+        'Убедитесь, что оригинал фото доступен по клику.'
+    )
+
+
+@pytest.mark.django_db
+def test_variants_follow_image(processed_post):
+    post = processed_post
+    old_name = post.image.name
+
+    post.image = make_image('other.png', size=(300, 200))
+    post.save()
+    assert not Post.objects.get(pk=post.pk).has_image_variants, (
+        'Убедитесь, что после замены фото карточка не ссылается '
+        'на копии старого фото.'
+    )
+    run_pending()
+    post = Post.objects.get(pk=post.pk)
+    assert post.image.name != old_name and post.has_image_variants
+    assert all(
+        default_storage.exists(name) for name in variant_names(post.image.name)
+    ), 'Убедитесь, что для нового фото готовятся копии.'
+
+
+@pytest.mark.django_db
+def test_image_is_processed_by_worker(user_client, post_with_big_image):
+    post = post_with_big_image
+    assert not Post.objects.get(pk=post.pk).has_image_variants, (
+        'Убедитесь, что копии фото готовятся не в запросе, а фоновой задачей.'
+    )
+    content = user_client.get(f'/posts/{post.pk}/edit/').content.decode()
+    assert 'Фото обрабатывается' in content, (
+        'Убедитесь, что на странице редактирования виден статус обработки фото.'
+    )
+
+    call_command('runworker', '--once', stdout=StringIO())
+    assert Job.objects.get(post=post).status == Job.DONE
+    assert Post.objects.get(pk=post.pk).has_image_variants
+    content = user_client.get(f'/posts/{post.pk}/edit/').content.decode()
+    assert 'Фото обработано' in content
+
+
+@pytest.mark.django_db
+def test_broken_image_is_rejected_by_worker(user_client, post_with_big_image):
+    post = post_with_big_image
+    run_pending()
+    post.image.save('broken.png', ContentFile(b'not an image'))
+    run_pending()
+
+    job = Job.objects.filter(post=post).latest('id')
+    assert job.status == Job.FAILED and job.error, (
+        'Убедитесь, что задача с некорректным файлом завершается ошибкой.'
+    )
+    assert not Post.objects.get(pk=post.pk).image, (
+        'Убедитесь, что некорректный файл не остаётся фото публикации.'
+    )
+    content = user_client.get(f'/posts/{post.pk}/edit/').content.decode()
+    assert 'Фото не обработано' in content
+
+
+@pytest.mark.django_db
+def test_rejected_image_leaves_cached_card(client, post_with_big_image):
+    post = post_with_big_image
+    run_pending()
+    post.image.save('broken.png', ContentFile(b'not an image'))
+    broken_url = Post.objects.get(pk=post.pk).image.url
+    assert broken_url in client.get('/').content.decode('utf-8')
+
+    run_pending()
+    assert broken_url not in client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что после отклонения фото закешированная карточка '
+        'публикации больше не ссылается на него.'
+    )
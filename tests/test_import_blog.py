@@ -0,0 +1,100 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+
+from blog.dump import iter_objects
+from blog.models import Comment, Post
+from blog.search import search_posts
+
+OBJECTS = [
+    {'model': 'blog.category', 'pk': 10, 'fields': {
+        'title': 'Импорт', 'description': 'Описание', 'slug': 'import',
+        'is_published': True, 'created_at': '2022-12-18T23:03:52Z'}},
+    {'model': 'auth.user', 'pk': 10, 'fields': {
+        'username': 'importer', 'password': '', 'groups': [],
+        'date_joined': '2022-12-18T22:57:29Z'}},
+    {'model': 'admin.logentry', 'pk': 1, 'fields': {}},
+    *({'model': 'blog.post', 'pk': 100 + number, 'fields': {
+        'title': f'Импортированная публикация {number}',
+        'text': 'Текст про контрабас' if number == 1 else 'Текст',
+        'pub_date': '2022-12-19T10:00:00Z',
+        'created_at': '2022-12-18T23:06:18Z',
+        'author': 10, 'category': 10, 'location': None,
+        'is_published': True}} for number in range(1, 6)),
+    *({'model': 'blog.comment', 'pk': 200 + number, 'fields': {
+        'post': 101, 'author': 10, 'text': 'Комментарий',
+        'is_published': True,
+        'created_at': '2022-12-20T10:00:00Z'}} for number in range(3)),
+]
+
+
+def test_iter_objects_reads_array_and_ndjson():
+    array = json.dumps(OBJECTS, ensure_ascii=False, indent=2)
+    ndjson = '\n'.join(json.dumps(obj) for obj in OBJECTS)
+    for text in (array, ndjson):
+        parsed = list(iter_objects(StringIO(text), chunk_size=7))
+        assert parsed == OBJECTS, (
+            'Убедитесь, что дамп читается по частям в обоих форматах.'
+        )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('defer_indexes', [False, True])
+def test_import_blog(tmp_path, defer_indexes):
+    path = tmp_path / 'dump.ndjson'
+    path.write_text('\n'.join(json.dumps(obj) for obj in OBJECTS))
+    args = ['--defer-indexes'] if defer_indexes else []
+    out = StringIO()
+    call_command('import_blog', str(path), '--batch-size', '2', *args,
+                 stdout=out)
+
+    assert Post.objects.count() == 5 and Comment.objects.count() == 3
+    assert 'строк/с' in out.getvalue(), (
+        'Убедитесь, что import_blog сообщает скорость загрузки.'
+    )
+    post = Post.objects.get(pk=101)
+    assert post.created_at.year == 2022, (
+        'Убедитесь, что import_blog сохраняет даты из дампа.'
+    )
+    assert post.comment_count == 3, (
+        'Убедитесь, что после импорта пересчитываются счётчики комментариев.'
+    )
+    assert [found.pk for found in search_posts(
+        Post.objects.all(), 'контрабас')] == [101], (
+        'Убедитесь, что импортированные публикации попадают в поиск.'
+    )
+
+
+@pytest.fixture
+def other_database(settings, tmp_path):
+    """Вторая файловая база под псевдонимом `other`."""
+    # ReplicaRouter пишет всё в default и мешает миграциям другой базы.
+    settings.DATABASE_ROUTERS = []
+    connections.settings['other'] = {
+        **connections['default'].settings_dict,
+        'NAME': str(tmp_path / 'other.sqlite3'),
+    }
+    try:
+        call_command('migrate', database='other', verbosity=0)
+        yield 'other'
+    finally:
+        connections['other'].close()
+        del connections.settings['other']
+        delattr(connections._connections, 'other')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_import_blog_into_other_database(tmp_path, other_database):
+    path = tmp_path / 'dump.ndjson'
+    path.write_text('\n'.join(json.dumps(obj) for obj in OBJECTS))
+    call_command('import_blog', str(path), database=other_database,
+                 stdout=StringIO())
+    assert not Post.objects.exists()
+    post = Post.objects.using(other_database).get(pk=101)
+    assert post.comment_count == 3, (
+        'Убедитесь, что import_blog пересчитывает счётчики комментариев '
+        'в той базе, куда загружает дамп.'
+    )
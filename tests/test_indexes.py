@@ -0,0 +1,48 @@
+import re
+
+import pytest
+from django.db import connection
+
+from blog.views import CategoryPostsView, PostListView
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != 'sqlite',
+    reason='Формат EXPLAIN проверяется только для SQLite.'
+)
+
+
+def get_view_queryset(rf, view_class, url, **kwargs):
+    view = view_class()
+    view.setup(rf.get(url), **kwargs)
+    return view.get_queryset()[:10]
+
+
+def assert_uses_index(queryset, view_name):
+    plan = queryset.explain()
+    post_lines = [
+        line for line in plan.splitlines() if 'blog_post' in line
+    ]
+    assert post_lines, plan
+    for line in post_lines:
+        assert re.search(r'USING (COVERING )?INDEX', line), (
+            f'Убедитесь, что запрос публикаций для `{view_name}` '
+            f'использует индекс, а не полный просмотр таблицы:\n{plan}'
+        )
+    assert 'TEMP B-TREE FOR ORDER BY' not in plan, (
+        f'Убедитесь, что сортировка публикаций для `{view_name}` '
+        f'выполняется по индексу:\n{plan}'
+    )
+
+
+@pytest.mark.django_db
+def test_feed_query_uses_index(rf):
+    queryset = get_view_queryset(rf, PostListView, '/')
+    assert_uses_index(queryset, 'PostListView')
+
+
+@pytest.mark.django_db
+def test_category_query_uses_index(rf, published_category):
+    slug = published_category.slug
+    queryset = get_view_queryset(
+        rf, CategoryPostsView, f'/category/{slug}/', category_slug=slug)
+    assert_uses_index(queryset, 'CategoryPostsView')
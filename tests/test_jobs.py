@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.jobs import HANDLERS, enqueue, requeue_stale, run_pending
+from blog.models import Job
+
+
+@pytest.fixture
+def flaky_job():
+    calls = []
+
+    def handler(task):
+        calls.append(task.attempts)
+        raise RuntimeError('database is locked')
+
+    HANDLERS['test_flaky'] = handler
+    yield calls
+    del HANDLERS['test_flaky']
+
+
+@pytest.mark.django_db
+def test_transient_error_is_retried_later(settings, flaky_job):
+    settings.BLOG_JOBS_MAX_ATTEMPTS = 3
+    queued = enqueue('test_flaky')
+    assert run_pending() == 1
+    assert flaky_job == [1], (
+        'Убедитесь, что после временной ошибки задача не забирается '
+        'повторно в том же проходе воркера.'
+    )
+    queued.refresh_from_db()
+    assert queued.status == Job.QUEUED
+    assert queued.run_after > timezone.now()
+
+    Job.objects.filter(pk=queued.pk).update(run_after=timezone.now())
+    run_pending()
+    assert flaky_job == [1, 2]
+
+
+@pytest.mark.django_db
+def test_stale_job_out_of_attempts_fails(settings, flaky_job):
+    settings.BLOG_JOBS_MAX_ATTEMPTS = 2
+    long_ago = timezone.now() - timedelta(hours=1)
+    retried = enqueue('test_flaky')
+    exhausted = enqueue('test_flaky')
+    Job.objects.filter(pk=retried.pk).update(
+        status=Job.RUNNING, attempts=1, started_at=long_ago)
+    Job.objects.filter(pk=exhausted.pk).update(
+        status=Job.RUNNING, attempts=2, started_at=long_ago)
+
+    assert requeue_stale(600) == 1
+    assert Job.objects.get(pk=retried.pk).status == Job.QUEUED
+    assert Job.objects.get(pk=exhausted.pk).status == Job.FAILED, (
+        'Убедитесь, что брошенная задача, исчерпавшая попытки, '
+        'не возвращается в очередь при каждом перезапуске воркера.'
+    )
@@ -0,0 +1,83 @@
+import pytest
+
+HASHED = 'posts_images/ab/' + 'ab' * 32 + '.jpg'
+CONTENT = b'0123456789abcdef'
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    for name in ('plain.txt', HASHED):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(CONTENT)
+
+
+def body(response):
+    return b''.join(response.streaming_content)
+
+
+def test_media_is_served_with_validators(client):
+    response = client.get('/media/plain.txt')
+    assert response.status_code == 200 and body(response) == CONTENT
+    assert response['ETag'] and response['Last-Modified'], (
+        'Убедитесь, что медиафайлы отдаются с ETag и Last-Modified.'
+    )
+    assert response['Accept-Ranges'] == 'bytes'
+
+    not_modified = client.get(
+        '/media/plain.txt', HTTP_IF_NONE_MATCH=response['ETag']
+    )
+    assert not_modified.status_code == 304, (
+        'Убедитесь, что на If-None-Match с текущим ETag возвращается 304.'
+    )
+    not_modified = client.get(
+        '/media/plain.txt', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    )
+    assert not_modified.status_code == 304
+
+
+def test_hashed_media_is_immutable(client):
+    hashed = client.get(f'/media/{HASHED}')
+    assert 'immutable' in hashed['Cache-Control'], (
+        'Убедитесь, что файлы с хешем в имени кешируются надолго.'
+    )
+    assert 'immutable' not in client.get('/media/plain.txt')['Cache-Control']
+
+
+@pytest.mark.parametrize('header, status, expected, content_range', [
+    ('bytes=2-5', 206, CONTENT[2:6], 'bytes 2-5/16'),
+    ('bytes=10-', 206, CONTENT[10:], 'bytes 10-15/16'),
+    ('bytes=-4', 206, CONTENT[-4:], 'bytes 12-15/16'),
+    ('bytes=20-30', 416, None, 'bytes */16'),
+])
+def test_media_range(client, header, status, expected, content_range):
+    response = client.get('/media/plain.txt', HTTP_RANGE=header)
+    assert response.status_code == status, (
+        'Убедитесь, что медиафайлы поддерживают запросы диапазонов.'
+    )
+    assert response['Content-Range'] == content_range
+    if expected is not None:
+        assert body(response) == expected
+
+
+def test_media_range_ignored_for_stale_if_range(client):
+    response = client.get(
+        '/media/plain.txt', HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='"stale"'
+    )
+    assert response.status_code == 200 and body(response) == CONTENT
+
+
+def test_media_accel_redirect(settings, client):
+    settings.MEDIA_SENDFILE = 'x-accel-redirect'
+    response = client.get('/media/plain.txt')
+    assert response['X-Accel-Redirect'] == '/protected-media/plain.txt', (
+        'Убедитесь, что в режиме X-Accel-Redirect файл отдаёт фронтовой '
+        'сервер.'
+    )
+    assert response.content == b''
+
+
+@pytest.mark.parametrize('path', ['../secret.txt', 'missing.txt', 'posts_images'])
+def test_media_not_found(client, path):
+    assert client.get(f'/media/{path}').status_code == 404
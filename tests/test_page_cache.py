@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.cache import page_timeout
+from blog.checks import check_shared_cache
+
+
+def get_content(client, url) -> str:
+    return client.get(url).content.decode('utf-8')
+
+
+@pytest.mark.django_db
+def test_anonymous_pages_are_cached(
+        client, post_with_published_location, published_category):
+    post = post_with_published_location
+    urls = ['/', f'/category/{published_category.slug}/', f'/posts/{post.id}/']
+    for url in urls:
+        first = get_content(client, url)
+        with CaptureQueriesContext(connection) as context:
+            second = get_content(client, url)
+        assert second == first
+        assert not context.captured_queries, (
+            f'Убедитесь, что страница `{url}` для анонимного пользователя'
+            ' отдаётся из кеша без обращений к базе данных.'
+        )
+
+
+@pytest.mark.django_db
+def test_page_cache_is_purged_on_changes(
+        mixer, user, client, post_with_published_location,
+        published_category):
+    post = post_with_published_location
+    category_url = f'/category/{published_category.slug}/'
+    get_content(client, '/')
+    get_content(client, category_url)
+    get_content(client, f'/posts/{post.id}/')
+
+    new_post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=timezone.now() - timedelta(minutes=1))
+    assert new_post.title in get_content(client, '/'), (
+        'Убедитесь, что кеш ленты сбрасывается при публикации поста.'
+    )
+    assert new_post.title in get_content(client, category_url), (
+        'Убедитесь, что кеш страницы категории сбрасывается при'
+        ' публикации поста в этой категории.'
+    )
+
+    comment = mixer.blend(
+        'blog.Comment', post=post, text='Свежий комментарий')
+    assert comment.text in get_content(client, f'/posts/{post.id}/'), (
+        'Убедитесь, что кеш страницы публикации сбрасывается при'
+        ' добавлении комментария.'
+    )
+
+
+@pytest.mark.django_db
+def test_page_cache_expires_at_next_publication(mixer, user):
+    mixer.blend(
+        'blog.Post', author=user, is_published=True,
+        pub_date=timezone.now() + timedelta(seconds=30))
+    assert 0 < page_timeout() <= 30, (
+        'Убедитесь, что страницы кешируются не дольше, чем до ближайшей'
+        ' отложенной публикации.'
+    )
+
+
+@pytest.mark.django_db
+def test_authenticated_pages_are_not_cached(
+        user_client, post_with_published_location):
+    get_content(user_client, '/')
+    with CaptureQueriesContext(connection) as context:
+        get_content(user_client, '/')
+    assert context.captured_queries
+
+
+def test_process_local_cache_is_reported(settings):
+    assert not check_shared_cache(None)
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }}
+    assert [error.id for error in check_shared_cache(None)] == [
+        'blog.W001'
+    ], (
+        'Убедитесь, что проверка предупреждает о кеше, который не общий '
+        'для процессов веб-сервера.'
+    )
@@ -0,0 +1,43 @@
+import pytest
+from django.core.cache import cache
+
+from blog.cache import post_card_key
+from blog.models import Post
+
+
+def get_index(client) -> str:
+    return client.get('/').content.decode('utf-8')
+
+
+@pytest.mark.django_db
+def test_post_card_is_cached(user_client, post_with_published_location):
+    get_index(user_client)
+    post = Post.objects.with_related().get(pk=post_with_published_location.pk)
+    assert cache.get(post_card_key(post)), (
+        'Убедитесь, что отрендеренная карточка публикации сохраняется в кеше.'
+    )
+
+
+@pytest.mark.django_db
+def test_post_card_follows_changes(
+        user_client, post_with_published_location, published_category):
+    post = post_with_published_location
+    assert post.title in get_index(user_client)
+
+    post.title = 'Новый заголовок публикации'
+    post.save()
+    assert post.title in get_index(user_client), (
+        'Убедитесь, что карточка обновляется после правки публикации.'
+    )
+
+    published_category.title = 'Новое название категории'
+    published_category.save()
+    assert published_category.title in get_index(user_client), (
+        'Убедитесь, что карточки обновляются после правки категории.'
+    )
+
+    user_client.post(
+        f'/posts/{post.id}/comment/', data={'text': 'Комментарий'})
+    assert 'Комментарии (1)' in get_index(user_client), (
+        'Убедитесь, что в карточке обновляется число комментариев.'
+    )
@@ -0,0 +1,74 @@
+import pstats
+
+import pytest
+from django.test import Client
+
+from core.profiling import normalize_sql
+
+
+@pytest.fixture
+def profiling(settings, tmp_path):
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_DUMP_DIR = tmp_path
+    return settings
+
+
+def server_timing(response):
+    metrics = {}
+    for metric in response['Server-Timing'].split(', '):
+        name, *params = metric.split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+
+def test_normalize_sql_groups_parameter_lists():
+    assert normalize_sql(
+        'SELECT * FROM t WHERE id IN (%s, %s, %s) LIMIT 21'
+    ) == normalize_sql(
+        'SELECT *  FROM t WHERE id IN (%s, %s) LIMIT 10'
+    ), 'Запросы с разным числом параметров должны попадать в одну группу.'
+
+
+@pytest.mark.django_db
+def test_profiling_disabled_by_default(client, post_with_published_location):
+    response = client.get('/')
+    assert 'Server-Timing' not in response, (
+        'Без PROFILING_ENABLED заголовок Server-Timing не нужен.'
+    )
+
+
+@pytest.mark.django_db
+def test_server_timing_reports_sql_templates_and_cache(
+        profiling, post_with_published_location):
+    client = Client()
+    metrics = server_timing(client.get('/'))
+    assert {'total', 'sql', 'template', 'cache'} <= metrics.keys(), (
+        'Убедитесь, что Server-Timing содержит время запроса, SQL, '
+        'шаблонов и кеша.'
+    )
+    assert metrics['sql']['desc'] != '"0 queries"', (
+        'Убедитесь, что SQL-запросы подсчитываются.'
+    )
+    assert float(metrics['template']['dur']) > 0, (
+        'Убедитесь, что учитывается время отрисовки шаблонов.'
+    )
+    metrics = server_timing(client.get('/'))
+    assert metrics['sql']['desc'] == '"0 queries"', (
+        'Страница из кеша не должна обращаться к базе.'
+    )
+    assert not metrics['cache']['desc'].startswith('"0 hits'), (
+        'Убедитесь, что подсчитываются попадания в кеш.'
+    )
+
+
+@pytest.mark.django_db
+def test_sampled_request_dumps_profile(
+        profiling, post_with_published_location, tmp_path):
+    profiling.PROFILING_SAMPLE_RATE = 1.0
+    response = Client().get('/')
+    assert response.status_code == 200
+    dumps = list(tmp_path.glob('*.prof'))
+    assert len(dumps) == 1, (
+        'Убедитесь, что выборочные запросы сохраняются в PROFILING_DUMP_DIR.'
+    )
+    assert pstats.Stats(str(dumps[0])).total_calls > 0
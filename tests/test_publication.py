@@ -0,0 +1,85 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from blog.models import Post
+from blog.publication import (
+    WINDOW_KEY, next_publication_at, visibility_cutoff
+)
+
+
+@pytest.mark.django_db
+def test_cutoff_is_stable_until_horizon(mixer, user):
+    future_post = mixer.blend(
+        'blog.Post', author=user, is_published=True,
+        pub_date=timezone.now() + timedelta(hours=1))
+    cutoff = visibility_cutoff()
+    assert next_publication_at() == future_post.pub_date
+    assert visibility_cutoff() == cutoff, (
+        'Убедитесь, что отсечка видимости не меняется до наступления'
+        ' горизонта публикации.'
+    )
+    assert future_post not in Post.objects.published()
+
+    later = future_post.pub_date + timedelta(seconds=1)
+    with mock.patch.object(timezone, 'now', return_value=later):
+        assert visibility_cutoff() == later
+        assert future_post in Post.objects.published(), (
+            'Убедитесь, что отложенная публикация становится видимой после'
+            ' наступления её даты.'
+        )
+
+
+@pytest.mark.django_db
+def test_saved_post_resets_window(mixer, user):
+    visibility_cutoff()
+    post = mixer.blend(
+        'blog.Post', author=user, is_published=True,
+        pub_date=timezone.now())
+    assert post in Post.objects.published(), (
+        'Убедитесь, что сохранение публикации сбрасывает горизонт'
+        ' публикации.'
+    )
+
+
+@pytest.mark.django_db
+def test_publish_scheduled_command(mixer, user):
+    future_post = mixer.blend(
+        'blog.Post', author=user, is_published=True,
+        pub_date=timezone.now() + timedelta(minutes=5))
+    output = StringIO()
+    call_command('publish_scheduled', stdout=output)
+    assert str(future_post.pub_date) in output.getvalue()
+
+
+@pytest.mark.django_db
+def test_publish_scheduled_purges_cached_pages(
+        client, mixer, user, published_category):
+    future_post = mixer.blend(
+        'blog.Post', author=user, is_published=True, location=None,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(minutes=5))
+    link = f'/posts/{future_post.id}/'
+    assert link not in client.get('/').content.decode()
+
+    later = future_post.pub_date + timedelta(seconds=1)
+    with mock.patch.object(timezone, 'now', return_value=later):
+        assert link not in client.get('/').content.decode()
+        # Команда запускается отдельным процессом и не застаёт окно.
+        cache.delete(WINDOW_KEY)
+        call_command('publish_scheduled', stdout=StringIO())
+        assert link in client.get('/').content.decode(), (
+            'Убедитесь, что `publish_scheduled` сбрасывает закешированную '
+            'ленту, когда наступает дата отложенной публикации.'
+        )
+
+
+def test_publish_scheduled_rejects_sleep_longer_than_window(settings):
+    settings.BLOG_PUBLICATION_WINDOW_MAX_AGE = 60
+    with pytest.raises(CommandError):
+        call_command('publish_scheduled', loop=True, max_sleep=60)
@@ -0,0 +1,60 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def count_queries(client, url) -> int:
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'url', [
+        '/',
+        '/profile/{username}/',
+        '/category/{category_slug}/',
+    ],
+    ids=['index', 'profile', 'category'],
+)
+def test_listing_queries_do_not_depend_on_posts(
+        mixer, user, user_client, published_category, published_location,
+        url):
+    url = url.format(
+        username=user.username, category_slug=published_category.slug)
+
+    def add_posts(count):
+        mixer.cycle(count).blend(
+            'blog.Post', author=user, category=published_category,
+            location=published_location,
+        )
+
+    add_posts(1)
+    few_posts_queries = count_queries(user_client, url)
+    add_posts(9)
+    many_posts_queries = count_queries(user_client, url)
+    assert many_posts_queries == few_posts_queries, (
+        f'Убедитесь, что число SQL-запросов на странице `{url}` не зависит'
+        ' от количества публикаций на ней: автор, категория, местоположение'
+        ' и число комментариев должны загружаться одним запросом.'
+    )
+
+
+@pytest.mark.django_db
+def test_post_detail_queries_do_not_depend_on_comments(
+        mixer, user_client, post_with_published_location):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+
+    mixer.blend('blog.Comment', post=post)
+    few_comments_queries = count_queries(user_client, url)
+    mixer.cycle(5).blend('blog.Comment', post=post)
+    many_comments_queries = count_queries(user_client, url)
+    assert many_comments_queries == few_comments_queries, (
+        'Убедитесь, что число SQL-запросов на странице публикации не'
+        ' зависит от количества комментариев к ней.'
+    )
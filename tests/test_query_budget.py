@@ -0,0 +1,94 @@
+from http import HTTPStatus
+
+import pytest
+
+pytestmark = pytest.mark.query_budget(time_ms=100)
+
+
+@pytest.fixture
+def own_comment(mixer, user, post_with_published_location):
+    return mixer.blend(
+        'blog.Comment', post=post_with_published_location, author=user)
+
+
+@pytest.fixture
+def many_comments(mixer, post_with_published_location):
+    return mixer.cycle(20).blend(
+        'blog.Comment', post=post_with_published_location)
+
+
+@pytest.mark.query_budget(queries=1)
+def test_budget_markers_are_merged(query_budget):
+    assert (query_budget.queries, query_budget.time_ms) == (1, 100), (
+        'Убедитесь, что маркер теста дополняет маркер модуля, '
+        'а не заменяет его.'
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'url, queries', [
+        ('/', 4),
+        ('/profile/{username}/', 5),
+        ('/category/{category_slug}/', 5),
+    ],
+    ids=['index', 'profile', 'category'],
+)
+def test_listing_budget(
+        query_budget, user, user_client, published_category,
+        many_posts_with_published_locations, url, queries):
+    url = url.format(
+        username=user.username, category_slug=published_category.slug)
+    # Горизонт публикации вычисляется один раз и дальше берётся из кеша.
+    user_client.get(url)
+    with query_budget(url, queries=queries):
+        response = user_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+@pytest.mark.query_budget(queries=4)
+def test_post_detail_budget(
+        query_budget, user_client, post_with_published_location,
+        many_comments):
+    url = f'/posts/{post_with_published_location.id}/'
+    with query_budget(url):
+        response = user_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'url, queries', [
+        ('/posts/{post_id}/comment/', 3),
+        ('/posts/{post_id}/edit_comment/{comment_id}/', 3),
+        ('/posts/{post_id}/delete_comment/{comment_id}/', 3),
+    ],
+    ids=['add_comment', 'edit_comment', 'delete_comment'],
+)
+def test_comment_pages_budget(
+        query_budget, user_client, own_comment, url, queries):
+    url = url.format(post_id=own_comment.post_id, comment_id=own_comment.id)
+    with query_budget(url, queries=queries):
+        response = user_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+
+
+# Публикация и комментарий загружаются один раз за запрос; остальное —
+# сессия, пользователь, запись и сброс кеша страниц.
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'url, data, queries', [
+        ('/posts/{post_id}/comment/', {'text': 'Новый'}, 8),
+        ('/posts/{post_id}/edit_comment/{comment_id}/',
+         {'text': 'Исправленный'}, 4),
+        ('/posts/{post_id}/delete_comment/{comment_id}/', {}, 8),
+    ],
+    ids=['add_comment', 'edit_comment', 'delete_comment'],
+)
+def test_comment_actions_budget(
+        query_budget, user_client, own_comment, url, data, queries):
+    url = url.format(post_id=own_comment.post_id, comment_id=own_comment.id)
+    with query_budget(url, queries=queries):
+        response = user_client.post(url, data)
+    assert response.status_code == HTTPStatus.FOUND
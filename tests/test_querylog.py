@@ -0,0 +1,74 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, RequestFactory
+
+from blog.models import Post
+from blog.querylog import QueryLog, current_log, query_wrapper
+
+
+@pytest.fixture
+def query_log(settings, tmp_path):
+    settings.BLOG_QUERY_LOG_ENABLED = True
+    settings.BLOG_QUERY_STATS_PATH = tmp_path / 'stats.ndjson'
+    return settings
+
+
+@pytest.mark.django_db
+def test_repeated_queries_are_flagged(settings, mixer, user):
+    settings.BLOG_QUERY_REPEAT_THRESHOLD = 3
+    posts = mixer.cycle(4).blend('blog.Post', author=user)
+    log = QueryLog(RequestFactory().get('/'))
+    token = current_log.set(log)
+    try:
+        with connection.execute_wrapper(query_wrapper):
+            Post.objects.get(pk=posts[0].pk)
+            Post.objects.get(pk=posts[0].pk)
+            for post in posts:
+                Post.objects.get(pk=post.pk)
+    finally:
+        current_log.reset(token)
+    repeated, = log.repeated()
+    assert repeated['count'] == 6 and repeated['identical'] == 2, (
+        'Убедитесь, что одинаковые запросы и N+1 по одному SQL '
+        'отмечаются как повторы.'
+    )
+    assert 'test_querylog' not in (repeated['origin'] or ''), (
+        'Место вызова ищется только в коде проекта.'
+    )
+
+
+@pytest.mark.django_db
+def test_slow_queries_logged_with_view_and_stats_written(
+        query_log, caplog, post_with_published_location):
+    query_log.BLOG_SLOW_QUERY_MS = 0
+    response = Client().get(f'/posts/{post_with_published_location.pk}/')
+    assert response.status_code == 200
+    messages = [
+        record.getMessage() for record in caplog.records
+        if record.name == 'blog.querylog'
+    ]
+    assert any(
+        'Медленный запрос' in message and 'blog:post_detail' in message
+        for message in messages
+    ), 'Убедитесь, что медленные запросы пишутся в лог с представлением.'
+    lines = query_log.BLOG_QUERY_STATS_PATH.read_text().splitlines()
+    summary = json.loads(lines[-1])
+    assert summary['view'] == 'blog:post_detail' and summary['slow'], (
+        'Убедитесь, что итоги запроса дописываются в BLOG_QUERY_STATS_PATH.'
+    )
+
+
+@pytest.mark.django_db
+def test_query_stats_command(query_log, post_with_published_location):
+    client = Client()
+    for _ in range(2):
+        client.get('/')
+    out = StringIO()
+    call_command('query_stats', stdout=out)
+    assert 'blog:index' in out.getvalue(), (
+        'Убедитесь, что query_stats выводит сводку по представлениям.'
+    )
@@ -0,0 +1,122 @@
+import sqlite3
+from io import StringIO
+
+import pytest
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import Client
+
+from blog.models import Post
+from core.db.replicas import PIN_COOKIE, ReplicaRouter, replica_reads
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+    return settings
+
+
+@pytest.fixture
+def replica_choices(monkeypatch):
+    """Запоминает выбор реплики, но читает из default: в тестах её нет."""
+    chosen = []
+
+    def choose(self, replicas):
+        chosen.append(replicas[0])
+        return 'default'
+
+    monkeypatch.setattr(ReplicaRouter, 'choose_replica', choose)
+    return chosen
+
+
+# Обычный тест django_db идёт в транзакции, а в ней роутер
+# намеренно читает с основной базы.
+@pytest.mark.django_db(transaction=True)
+def test_router_reads_from_replica_only_when_asked(replicas):
+    router = ReplicaRouter()
+    router.choose_replica = lambda replicas: replicas[0]
+    assert router.db_for_read(Post) is None
+    with replica_reads():
+        assert router.db_for_read(Post) == 'replica', (
+            'Убедитесь, что внутри replica_reads() чтение идёт на реплику.'
+        )
+        assert router.db_for_read(Session) is None, (
+            'Сессии нужно читать с основной базы.'
+        )
+        with transaction.atomic():
+            assert router.db_for_read(Post) == 'default', (
+                'Внутри транзакции нужно читать с основной базы.'
+            )
+    assert router.db_for_write(Post) == 'default'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_listing_reads_go_to_replica(
+        replicas, replica_choices, post_with_published_location):
+    response = Client().get('/')
+    assert response.status_code == 200
+    assert replica_choices, 'Убедитесь, что лента читается с реплики.'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_replica_page_not_cached_right_after_purge(
+        replicas, replica_choices, post_with_published_location):
+    client = Client()
+    # Публикация только что создана, её группы сброшены.
+    client.get('/')
+    replica_choices.clear()
+    client.get('/')
+    assert replica_choices, (
+        'Убедитесь, что страница, прочитанная с реплики сразу после '
+        'изменения данных, не попадает в кеш.'
+    )
+
+    cache.clear()
+    client.get('/')
+    replica_choices.clear()
+    client.get('/')
+    assert not replica_choices, (
+        'Убедитесь, что без недавних изменений страница с реплики '
+        'кешируется.'
+    )
+
+
+@pytest.mark.django_db
+def test_writer_pinned_to_primary(
+        replicas, replica_choices, user_client, post_with_published_location):
+    url = f'/posts/{post_with_published_location.pk}/'
+    response = user_client.post(f'{url}comment/', {'text': 'Комментарий'})
+    assert PIN_COOKIE in response.cookies, (
+        'Убедитесь, что после отправки формы ставится cookie закрепления '
+        'за основной базой.'
+    )
+    replica_choices.clear()
+    assert user_client.get(url).status_code == 200
+    assert not replica_choices, (
+        'Убедитесь, что после изменения данных пользователь читает '
+        'с основной базы.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sync_replicas_copies_database(
+        settings, tmp_path, mixer, post_with_published_location):
+    path = tmp_path / 'replica.sqlite3'
+    settings.DATABASES = {
+        **settings.DATABASES,
+        'replica': {**settings.DATABASES['default'], 'NAME': path},
+    }
+    settings.DATABASE_REPLICAS = ['replica']
+    call_command('sync_replicas', stdout=StringIO())
+    replica = sqlite3.connect(path)
+    try:
+        assert replica.execute(
+            'SELECT COUNT(*) FROM blog_post'
+        ).fetchone() == (1,), 'Убедитесь, что реплика получила данные.'
+        assert replica.execute(
+            'PRAGMA journal_mode'
+        ).fetchone() == ('delete',)
+    finally:
+        replica.close()
@@ -0,0 +1,97 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+
+def search(client, query):
+    response = client.get('/search/', {'q': query})
+    assert response.status_code == HTTPStatus.OK
+    return response
+
+
+def found_ids(response):
+    return [post.id for post in response.context['page_obj']]
+
+
+@pytest.fixture
+def searchable_posts(mixer, user, published_category):
+    past = timezone.now() - timedelta(days=1)
+    in_title = mixer.blend(
+        'blog.Post', author=user, category=published_category, pub_date=past,
+        title='Путешествие на Байкал', text='Зимой там очень красиво.')
+    in_text = mixer.blend(
+        'blog.Post', author=user, category=published_category, pub_date=past,
+        title='Заметки', text='Летом снова поеду на Байкал <b>непременно</b>.')
+    hidden = mixer.blend(
+        'blog.Post', author=user, category=published_category, pub_date=past,
+        is_published=False, title='Байкал', text='Черновик.')
+    return in_title, in_text, hidden
+
+
+@pytest.mark.django_db
+def test_search_ranks_and_hides(client, searchable_posts):
+    in_title, in_text, hidden = searchable_posts
+    ids = found_ids(search(client, 'байкал'))
+    assert ids == [in_title.id, in_text.id], (
+        'Убедитесь, что поиск находит опубликованные посты, ставит совпадения'
+        ' в заголовке выше совпадений в тексте и скрывает неопубликованные.'
+    )
+
+
+@pytest.mark.django_db
+def test_search_highlights_safely(client, searchable_posts):
+    content = search(client, 'летом').content.decode('utf-8')
+    assert '<mark>Летом</mark>' in content, (
+        'Убедитесь, что найденные слова подсвечиваются в сниппете.'
+    )
+    assert '<b>непременно' not in content, (
+        'Убедитесь, что текст публикации в сниппете экранируется.'
+    )
+
+
+@pytest.mark.django_db
+def test_search_index_follows_changes(client, searchable_posts):
+    in_title, in_text, _ = searchable_posts
+    in_title.title = 'Путешествие на Алтай'
+    in_title.save()
+    in_text.delete()
+    assert found_ids(search(client, 'алтай')) == [in_title.id]
+    assert found_ids(search(client, 'байкал')) == [], (
+        'Убедитесь, что поисковый индекс обновляется при правке и удалении'
+        ' публикаций.'
+    )
+
+
+@pytest.mark.django_db
+def test_search_survives_syntax(client, searchable_posts):
+    assert found_ids(search(client, '"байкал -(')), (
+        'Убедитесь, что спецсимволы в запросе не ломают поиск.'
+    )
+    assert found_ids(search(client, '')) == []
+
+
+@pytest.mark.django_db
+def test_search_reaches_older_and_skips_hidden(
+        client, settings, mixer, user, published_category):
+    settings.BLOG_SEARCH_MAX_CANDIDATES = 2
+    past = timezone.now() - timedelta(days=1)
+    visible = mixer.cycle(12).blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=past, title='Байкал', text='Зимой.')
+    # Самые новые совпадения скрыты и не должны вытеснять видимые.
+    mixer.cycle(3).blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=past, is_published=False, title='Байкал', text='Черновик.')
+    first_page = found_ids(search(client, 'байкал'))
+    assert len(first_page) == 10, (
+        'Убедитесь, что скрытые публикации не вытесняют из поиска видимые.'
+    )
+    response = client.get('/search/', {'q': 'байкал', 'page': 2})
+    assert set(first_page + found_ids(response)) == {
+        post.id for post in visible
+    }, (
+        'Убедитесь, что старые совпадения доступны на следующих страницах '
+        'поиска.'
+    )
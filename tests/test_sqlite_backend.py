@@ -0,0 +1,48 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+
+from core.db.backends.sqlite3.base import pragma_sql
+
+
+def pragma(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+def test_pragmas_applied_on_connect():
+    assert connection.vendor == 'sqlite'
+    assert pragma('busy_timeout') == 5000, (
+        'Убедитесь, что при соединении задаётся busy_timeout.'
+    )
+    assert pragma('synchronous') == 1, (
+        'Убедитесь, что при соединении задаётся synchronous = NORMAL.'
+    )
+    assert pragma('temp_store') == 2, (
+        'Убедитесь, что временные таблицы хранятся в памяти.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transactions_start_immediate():
+    executed = []
+
+    def remember(execute, sql, params, many, context):
+        executed.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(remember), transaction.atomic():
+        pass
+    assert 'BEGIN IMMEDIATE' in executed, (
+        'Убедитесь, что транзакции открываются в режиме transaction_mode.'
+    )
+
+
+def test_pragma_values_are_validated():
+    assert pragma_sql('cache_size', -20000) == 'PRAGMA cache_size = -20000'
+    for name, value in (('journal_mode', 'wal; DROP TABLE x'),
+                        ('foo bar', 1)):
+        with pytest.raises(ImproperlyConfigured):
+            pragma_sql(name, value)
@@ -0,0 +1,69 @@
+import hashlib
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from blog.models import Post
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def png_bytes(size):
+    buffer = BytesIO()
+    Image.new('L', size).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def create_post(client, category, content, name='photo.png'):
+    return client.post('/posts/create/', data={
+        'title': 'Публикация с фото',
+        'text': 'Текст',
+        'pub_date': '2020-01-01T10:00',
+        'category': category.pk,
+        'image': SimpleUploadedFile(name, content, content_type='image/png'),
+    })
+
+
+@pytest.mark.django_db
+def test_upload_is_accepted(user_client, published_category):
+    content = png_bytes((50, 50))
+    response = create_post(user_client, published_category, content)
+    assert response.status_code == 302
+    post = Post.objects.get()
+    with post.image.open('rb') as image:
+        assert hashlib.sha256(image.read()).digest() == (
+            hashlib.sha256(content).digest()
+        ), 'Убедитесь, что файл сохраняется без изменений.'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('limit_name, limit, size, message', [
+    ('BLOG_UPLOAD_MAX_PIXELS', 10_000, (2_000, 2_000), 'пикселей'),
+    ('BLOG_UPLOAD_MAX_SIZE', 100, (500, 500), 'Файл больше'),
+])
+def test_upload_limits(
+        settings, user_client, published_category,
+        limit_name, limit, size, message):
+    setattr(settings, limit_name, limit)
+    response = create_post(user_client, published_category, png_bytes(size))
+    assert response.status_code == 200 and not Post.objects.exists(), (
+        'Убедитесь, что файл сверх лимита не принимается.'
+    )
+    assert message in response.content.decode(), (
+        'Убедитесь, что форма объясняет, почему файл отклонён.'
+    )
+
+
+@pytest.mark.django_db
+def test_upload_of_non_image(user_client, published_category):
+    response = create_post(
+        user_client, published_category, b'plain text' * 100
+    )
+    assert response.status_code == 200 and not Post.objects.exists(), (
+        'Убедитесь, что файл без заголовка изображения не принимается.'
+    )